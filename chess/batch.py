@@ -0,0 +1,162 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections.abc import Iterator
+from multiprocessing import Pool
+from typing import TextIO
+from chess.engine import Engine
+from chess.game.game import ChessGame, long_algebraic
+
+# the game and engine of a worker process, reused for every position
+_game: ChessGame | None = None
+_engine: Engine | None = None
+_depth: int = 0
+
+
+def read_positions(file: TextIO) -> Iterator[tuple[int, str]]:
+	"""
+	yields (line number, position) for each position of a FEN or EPD file,
+	skipping empty lines and comments. EPD operations after the first four
+	fields are dropped, FEN clocks are kept.
+	"""
+	for number, line in enumerate(file, 1):
+		line = line.strip()
+		if not line or line.startswith('#'): continue
+
+		fields = line.split()
+		# a FEN ends with the two clocks, an EPD has operations instead
+		clocks = fields[4:6]
+		if len(clocks) == 2 and all(c.isdigit() for c in clocks):
+			fields = fields[:6]
+		else:
+			fields = fields[:4]
+		yield number, ' '.join(fields)
+
+
+def _init_worker(depth: int, hash_mb: int) -> None:
+	global _game, _engine, _depth
+	_game = ChessGame()
+	_depth = depth
+	if depth:
+		_engine = Engine(hash_mb)
+
+
+def analyse(position: tuple[int, str]) -> dict:
+	"""
+	analyses one (line number, FEN) in a worker process and returns the
+	result: the number of legal moves, the status of the player to move
+	and, if the workers were started with a depth, the engine's best move
+	and score in centipawns for the player to move. any error is returned
+	as the result of the line, one bad line must not stop the batch.
+	"""
+	number, fen = position
+	result: dict = {'line': number, 'fen': fen}
+	try:
+		_game.load_FEN(fen)
+	except Exception as e:
+		result['error'] = f'invalid FEN: {e!r}'
+		return result
+
+	try:
+		_analyse_position(result)
+	except Exception as e:
+		result['error'] = f'analysis failed: {e!r}'
+	return result
+
+
+def _analyse_position(result: dict) -> None:
+	moves = _game.legal_moves()
+	in_check = _game.current_player.is_in_check()
+	if not moves:
+		status = 'checkmate' if in_check else 'stalemate'
+	else:
+		status = 'check' if in_check else 'ongoing'
+
+	result['legal_moves'] = len(moves)
+	result['status'] = status
+
+	if _engine and moves:
+		piece, coordinate, promotion = _engine.best_move(_game, depth=_depth)
+		result['best_move'] = long_algebraic(piece.coordinate, coordinate, promotion)
+		result['score'] = _engine.score
+
+
+def run(
+	positions: Iterator[tuple[int, str]],
+	output: TextIO,
+	jobs: int,
+	depth: int = 0,
+	hash_mb: int = 16,
+	chunksize: int = 64
+) -> int:
+	"""
+	analyses the positions across a pool of jobs processes and writes
+	each result as a line of JSON as soon as it is done, so the results
+	come in the order they finish. returns the number of positions.
+	"""
+	count = 0
+	with Pool(jobs, _init_worker, (depth, hash_mb)) as pool:
+		for result in pool.imap_unordered(analyse, positions, chunksize):
+			output.write(json.dumps(result) + '\n')
+			count += 1
+
+	return count
+
+
+def main():
+	parser = argparse.ArgumentParser(
+		description='analyse every position of a FEN or EPD file in parallel.'
+	)
+	parser.add_argument(
+		'file', nargs='?', default='-',
+		help='file with one position per line, - for stdin(default: -)'
+	)
+	parser.add_argument(
+		'-o', '--output', default='-',
+		help='file to write the JSON lines to, - for stdout(default: -)'
+	)
+	parser.add_argument(
+		'-j', '--jobs', type=int, default=os.cpu_count(),
+		help='number of worker processes(default: number of cores)'
+	)
+	parser.add_argument(
+		'-d', '--depth', type=int, default=0,
+		help='also search each position to this depth(default: 0, no search)'
+	)
+	parser.add_argument(
+		'--hash', type=int, default=16,
+		help='transposition table size of each worker in MB(default: 16)'
+	)
+	parser.add_argument(
+		'--chunksize', type=int, default=64,
+		help='number of positions sent to a worker at once(default: 64)'
+	)
+	args = parser.parse_args()
+
+	input_file = sys.stdin if args.file == '-' else open(args.file)
+	output_file = sys.stdout if args.output == '-' else open(args.output, 'w')
+
+	start = time.perf_counter()
+	try:
+		count = run(
+			read_positions(input_file), output_file,
+			args.jobs, args.depth, args.hash, args.chunksize
+		)
+	finally:
+		if input_file is not sys.stdin:
+			input_file.close()
+		if output_file is not sys.stdout:
+			output_file.close()
+	elapsed = time.perf_counter() - start
+
+	print(
+		f'{count} positions in {elapsed:.2f}s, ' +
+		f'{count/elapsed if elapsed else 0:.0f} positions/s',
+		file=sys.stderr
+	)
+
+
+if __name__ == '__main__':
+	main()
@@ -3,6 +3,12 @@ from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING
 import enum
 from chess.utils import colored_str
+from chess.pst import PHASE, PST_EG, PST_MG
+from chess.zobrist import PAWN_KEYS, PIECE_KEYS
+from chess.tables import (
+	KING_MASKS, KNIGHT_MASKS, PAWN_MASKS, RAY_DIRECTIONS, RAY_MASKS, RAY_STEPS,
+	RAYS, bishop_attacks, first_blocker, rook_attacks
+)
 
 if TYPE_CHECKING:
 	from chess.game.player import Player
@@ -16,6 +22,17 @@ class PieceType(enum.Enum):
 	KNIGHT = 'n'
 	PAWN = 'p'
 
+	@property
+	def index(self) -> int:
+		""" position of the piece type in PIECE_TYPES(0-5). """
+		return _PIECE_TYPE_INDICES[self]
+
+
+PIECE_TYPES: tuple[PieceType, ...] = tuple(PieceType)
+_PIECE_TYPE_INDICES: dict[PieceType, int] = {
+	pt: i for i, pt in enumerate(PIECE_TYPES)
+}
+
 
 class Color(enum.Enum):
 	WHITE = 0
@@ -24,24 +41,76 @@ class Color(enum.Enum):
 	def __invert__(self):
 		return self.__class__(~self.value)
 
+	@property
+	def index(self) -> int:
+		""" 0 for white and 1 for black, used to index per-color tables. """
+		return -self.value
+
+
+def piece_index(color: Color, piece_type: PieceType) -> int:
+	"""
+	returns the index(0-11) of the given color and piece type
+	in Board.bitboards. white pieces come first.
+	"""
+	return color.index*len(PIECE_TYPES) + piece_type.index
+
+
+# bitboard indices of the sliding pieces, used by the board's attack maps
+_W_QUEEN = piece_index(Color.WHITE, PieceType.QUEEN)
+_W_ROOK = piece_index(Color.WHITE, PieceType.ROOK)
+_W_BISHOP = piece_index(Color.WHITE, PieceType.BISHOP)
+_B_QUEEN = piece_index(Color.BLACK, PieceType.QUEEN)
+_B_ROOK = piece_index(Color.BLACK, PieceType.ROOK)
+_B_BISHOP = piece_index(Color.BLACK, PieceType.BISHOP)
+
 
 class Coordinate:
-	def __init__(self, coordinate: str):
-		if not self.is_valid(coordinate):
+	"""
+	a square of the chess board, like 'e4'.
+	there are only 64 coordinate objects, created once on import.
+	constructing a coordinate returns the shared object of that square,
+	so they can be compared by identity and used in sets and dicts.
+	"""
+	__slots__ = ('file', 'rank', 'index', 'row', 'col')
+
+	def __new__(cls, coordinate: str) -> Coordinate:
+		if not cls.is_valid(coordinate):
 			raise ValueError('Invalid chess coordinate.')
 
-		self.file: str = coordinate[0].lower()
-		self.rank: str = coordinate[1]
+		return _COORDINATES_BY_NAME[coordinate]
+
+	@classmethod
+	def _create(cls, index: int) -> Coordinate:
+		""" builds the coordinate of the given index, only used on import. """
+		coordinate = super().__new__(cls)
+		coordinate.index = index
+		coordinate.row, coordinate.col = divmod(index, 8)
+		coordinate.file = 'abcdefgh'[coordinate.col]
+		coordinate.rank = '12345678'[coordinate.row]
+
+		return coordinate
+
+	@staticmethod
+	def from_index(index: int) -> Coordinate:
+		"""
+		returns the coordinate of the given square index(0-63).
+		a1 is 0, h1 is 7 and h8 is 63.
+		"""
+		return COORDINATES[index]
+
+	@staticmethod
+	def from_str(coordinate: str) -> Coordinate:
+		"""
+		returns the coordinate of the given string, like 'e4'.
+		raises KeyError for invalid strings, unlike the constructor.
+		"""
+		return _COORDINATES_BY_NAME[coordinate]
 
 	@staticmethod
 	def is_valid(coordinate: str) -> bool:
 		if not isinstance(coordinate, str):
 			raise TypeError('coordinate should be a str!')
-		return (
-			len(coordinate) == 2 and
-			(coordinate[0] in 'abcdefgh') and
-			(coordinate[1] in '12345678')
-		)
+		return coordinate in _COORDINATES_BY_NAME
 
 	@property
 	def regular(self) -> tuple[int, int]:
@@ -49,10 +118,7 @@ class Coordinate:
 		converts chess coordinates like 'a1' 
 		to regular matrix coordinates.
 		"""
-		row: int = '12345678'.index(self.rank)
-		col: int = 'abcdefgh'.index(self.file)
-
-		return row, col
+		return self.row, self.col
 
 	def __eq__(self, other: object):
 		if not isinstance(other, Coordinate):
@@ -61,16 +127,55 @@ class Coordinate:
 				f'{self.__class__.__name__} and {type(other)}!'
 			)
 
-		return self.file == other.file and self.rank == other.rank
+		return self is other
 
 	def __ne__(self, other: object):
 		return not self.__eq__(other)
 
+	def __hash__(self) -> int:
+		return self.index
+
+	def __copy__(self) -> Coordinate:
+		return self
+
+	def __deepcopy__(self, memo: dict) -> Coordinate:
+		return self
+
+	def __reduce__(self):
+		# unpickling goes through __new__ and gets the shared object back
+		return (Coordinate, (f'{self.file}{self.rank}',))
+
 	def __repr__(self):
 		return f'<{self.file}{self.rank}>'
 
 
+# all the 64 coordinates, indexed by Coordinate.index
+COORDINATES: tuple[Coordinate, ...] = tuple(
+	Coordinate._create(i) for i in range(64)
+)
+_COORDINATES_BY_NAME: dict[str, Coordinate] = {
+	f'{c.file}{c.rank}': c for c in COORDINATES
+}
+
+# tables.RAYS as coordinates, RAY_COORDINATES[direction][index]
+_RAY_COORDINATES: tuple[tuple[tuple[Coordinate, ...], ...], ...] = tuple(
+	tuple(tuple(COORDINATES[i] for i in ray) for ray in rays) for rays in RAYS
+)
+_RAY_DIRECTION_INDICES: dict[tuple[int, int], int] = {
+	direction: d for d, direction in enumerate(RAY_DIRECTIONS)
+}
+
+
 class Piece(ABC):
+	"""
+	a piece of a player. it holds no reference to its player or board, only
+	what changes during a game: the player is looked up by color from the
+	game, and the methods that look at the board are given it. the
+	subclasses add no attributes and declare empty __slots__ too, pieces
+	have no __dict__.
+	"""
+	__slots__ = ('color', 'coordinate', 'valid_moves', 'has_moved')
+
 	def __init__(self, player: Player, coordinate: Coordinate):
 		if not isinstance(coordinate, Coordinate):
 			raise TypeError(
@@ -82,15 +187,13 @@ class Piece(ABC):
 				f'player should be of type {Player.__name__}!'
 			)
 
-		self.player = player
-		self.board = player.board
 		self.color = player.color
 		self.coordinate = coordinate
 		self.valid_moves: list[Coordinate]
 		self.has_moved: bool = False
 
 		# put the piece on the board on init
-		self.board.put(self, self.coordinate)
+		player.board.put(self, self.coordinate)
 		# add the piece to player's pieces
 		player.add_piece(self)
 
@@ -99,17 +202,17 @@ class Piece(ABC):
 	def piece_type(self) -> PieceType: ...
 
 	@abstractmethod
-	def attacking_coordinates(self) -> list[Coordinate]: ...
+	def attacking_coordinates(self, board: Board) -> list[Coordinate]: ...
 
-	def available_moves(self) -> list[Coordinate]:
+	def available_moves(self, board: Board) -> list[Coordinate]:
 		"""
 		returns the moves that the piece can choose.
 		regardless of checks.
 		"""
 		moves: list[Coordinate] = []
 
-		for c in self.attacking_coordinates():
-			p: Piece | None = self.board.get(c).piece
+		for c in self.attacking_coordinates(board):
+			p: Piece | None = board.get(c).piece
 
 			# if is a piece of our own, cannot move there: ignore
 			if p and p.color == self.color: continue
@@ -137,6 +240,8 @@ class Piece(ABC):
 
 
 class Square:
+	__slots__ = ('_piece', 'coordinate')
+
 	def __init__(self, coordinate: Coordinate):
 		if not isinstance(coordinate, Coordinate):
 			raise TypeError(
@@ -146,16 +251,12 @@ class Square:
 		self._piece: Piece | None = None
 		self.coordinate: Coordinate = coordinate
 
-		# set the color based on the coordinate
-		self.set_color()
-
-	def set_color(self) -> None:
-		file_i: int = ord(self.coordinate.file) - ord('a')
-		rank_i: int = int(self.coordinate.rank) - 1
-		if (file_i + rank_i)%2 == 1:
-			self.color = Color.WHITE
-		else:
-			self.color = Color.BLACK
+	@property
+	def color(self) -> Color:
+		""" the color of the square, from its coordinate. """
+		if (self.coordinate.row + self.coordinate.col)%2 == 1:
+			return Color.WHITE
+		return Color.BLACK
 
 	def set_piece(self, piece: Piece):
 		if not isinstance(piece, Piece):
@@ -187,33 +288,252 @@ class Square:
 
 
 class Board:
+	__slots__ = (
+		'board_matrix', 'squares', 'bitboards', 'occupancy',
+		'attacks_from', '_attack_maps', 'zobrist_key', 'pawn_key',
+		'mg_score', 'eg_score', 'phase'
+	)
+
 	def __init__(self) -> None:
 		# the arrangement of these lists is initially such that
 		# the first row is equivalent to the rank 1, from a to h
 		# and the last row is the rank 8
 		self.board_matrix: list[list[Square]] = []
 
-		for rank in '12345678':
+		for row in range(8):
 			self.board_matrix.append(
-				[
-					Square(Coordinate(f'{file}{rank}'))
-					for file in 'abcdefgh'
-				]
+				[Square(COORDINATES[row*8 + col]) for col in range(8)]
 			)
 
+		# 64-entry mailbox holding the same squares as board_matrix
+		# indexed by row*8 + col, so a1 is 0, h1 is 7 and h8 is 63
+		self.squares: list[Square] = [
+			square for row in self.board_matrix for square in row
+		]
+
+		# one 64-bit integer per color and piece type
+		# the i-th bit is set if the square with index i holds such a piece
+		self.bitboards: list[int] = [0] * (2 * len(PIECE_TYPES))
+
+		# all the pieces of each color, indexed by Color.index
+		self.occupancy: list[int] = [0, 0]
+
+		# attacks_from[i] is the bitboard of squares attacked by the piece
+		# on the square with index i(0 if empty). kept up to date by
+		# put and remove, which only recompute the changed square and
+		# the sliding pieces whose rays go through it.
+		self.attacks_from: list[int] = [0] * 64
+
+		# union of attacks_from per color, None when it has to be rebuilt
+		self._attack_maps: list[int | None] = [0, 0]
+
+		# zobrist hash of the piece placement, updated by put and remove
+		self.zobrist_key: int = 0
+		# zobrist hash of the pawns only, keys the pawn hash table
+		self.pawn_key: int = 0
+
+		# material and piece-square scores from white's point of view,
+		# for the midgame and the endgame, and the game phase of the
+		# pieces on the board. see chess.pst, updated by put and remove
+		self.mg_score: int = 0
+		self.eg_score: int = 0
+		self.phase: int = 0
+
+	@property
+	def occupied(self) -> int:
+		""" bitboard of all the pieces on the board, of any color. """
+		return self.occupancy[0] | self.occupancy[1]
+
+	def bitboard(self, color: Color, piece_type: PieceType) -> int:
+		""" returns the bitboard of the given color's pieces of piece_type. """
+		return self.bitboards[piece_index(color, piece_type)]
+
 	def put(self, piece: Piece, coordinate: Coordinate) -> None:
 		"""
 		takes a chess coordinate and puts the given piece
 		in the appropriate square.
 		"""
-		row, col = coordinate.regular
-		self.board_matrix[row][col].set_piece(piece)
+		i = coordinate.index
+		square = self.squares[i]
+
+		# the piece that was there(if any) is replaced
+		if square.piece:
+			self._clear_bit(square.piece, i)
+
+		square.set_piece(piece)
 		piece.coordinate = coordinate
 
+		bit = 1 << i
+		p_index = piece_index(piece.color, piece.piece_type)
+		self.bitboards[p_index] |= bit
+		self.occupancy[piece.color.index] |= bit
+		self.zobrist_key ^= PIECE_KEYS[p_index][i]
+		self.pawn_key ^= PAWN_KEYS[p_index][i]
+		self.mg_score += PST_MG[p_index][i]
+		self.eg_score += PST_EG[p_index][i]
+		self.phase += PHASE[p_index]
+
+		self._update_attacks(i)
+
 	def remove(self, coordinate: Coordinate) -> None:
 		""" removes the piece(if any) from the given coordinate. """
-		row, col = coordinate.regular
-		self.board_matrix[row][col].remove_piece()
+		i = coordinate.index
+		square = self.squares[i]
+		if not square.piece: return
+
+		self._clear_bit(square.piece, i)
+		square.remove_piece()
+
+		self._update_attacks(i)
+
+	def clear(self) -> None:
+		""" removes all the pieces from the board at once. """
+		for square in self.squares:
+			square.remove_piece()
+
+		self.bitboards = [0] * (2 * len(PIECE_TYPES))
+		self.occupancy = [0, 0]
+		self.attacks_from = [0] * 64
+		self._attack_maps = [0, 0]
+		self.zobrist_key = self.pawn_key = 0
+		self.mg_score = self.eg_score = self.phase = 0
+
+	def set_pieces(self, pieces: list[Piece]) -> None:
+		"""
+		puts the given pieces on their coordinates, which must be empty.
+		the attacks of the whole board are computed once at the end,
+		instead of updating them after each piece.
+		"""
+		bitboards = self.bitboards
+		occupancy = self.occupancy
+		for piece in pieces:
+			i = piece.coordinate.index
+			self.squares[i].set_piece(piece)
+
+			bit = 1 << i
+			p_index = piece_index(piece.color, piece.piece_type)
+			bitboards[p_index] |= bit
+			occupancy[piece.color.index] |= bit
+			self.zobrist_key ^= PIECE_KEYS[p_index][i]
+			self.pawn_key ^= PAWN_KEYS[p_index][i]
+			self.mg_score += PST_MG[p_index][i]
+			self.eg_score += PST_EG[p_index][i]
+			self.phase += PHASE[p_index]
+
+		occupied = self.occupied
+		squares = occupied
+		while squares:
+			lsb = squares & -squares
+			i = lsb.bit_length() - 1
+			self.attacks_from[i] = self.piece_attacks(self.squares[i].piece, i, occupied)
+			squares ^= lsb
+
+		self._attack_maps = [None, None]
+
+	def _clear_bit(self, piece: Piece, i: int) -> None:
+		"""
+		clears the bit of the given square index from piece's bitboards
+		and takes the piece out of the zobrist key and the scores.
+		"""
+		mask = ~(1 << i)
+		p_index = piece_index(piece.color, piece.piece_type)
+		self.bitboards[p_index] &= mask
+		self.occupancy[piece.color.index] &= mask
+		self.zobrist_key ^= PIECE_KEYS[p_index][i]
+		self.pawn_key ^= PAWN_KEYS[p_index][i]
+		self.mg_score -= PST_MG[p_index][i]
+		self.eg_score -= PST_EG[p_index][i]
+		self.phase -= PHASE[p_index]
+
+	def _update_attacks(self, i: int) -> None:
+		""" updates attacks_from after the square with index i changed. """
+		occupied = self.occupied
+
+		piece = self.squares[i].piece
+		self.attacks_from[i] = self.piece_attacks(piece, i, occupied) if piece else 0
+
+		# the sliding pieces that reach this square now see
+		# further(if it got empty) or less far(if it got occupied)
+		bb = self.bitboards
+		sliders = (
+			rook_attacks(i, occupied) & (
+				bb[_W_ROOK] | bb[_W_QUEEN] | bb[_B_ROOK] | bb[_B_QUEEN]
+			) |
+			bishop_attacks(i, occupied) & (
+				bb[_W_BISHOP] | bb[_W_QUEEN] | bb[_B_BISHOP] | bb[_B_QUEEN]
+			)
+		)
+		while sliders:
+			lsb = sliders & -sliders
+			j = lsb.bit_length() - 1
+			self.attacks_from[j] = self.piece_attacks(
+				self.squares[j].piece, j, occupied
+			)
+			sliders ^= lsb
+
+		self._attack_maps = [None, None]
+
+	@staticmethod
+	def piece_attacks(piece: Piece, i: int, occupied: int) -> int:
+		"""
+		returns the bitboard of squares attacked by the given piece
+		if it stands on the square with index i.
+		"""
+		match piece.piece_type:
+			case PieceType.PAWN:
+				return PAWN_MASKS[piece.color.index][i]
+			case PieceType.KNIGHT:
+				return KNIGHT_MASKS[i]
+			case PieceType.BISHOP:
+				return bishop_attacks(i, occupied)
+			case PieceType.ROOK:
+				return rook_attacks(i, occupied)
+			case PieceType.QUEEN:
+				return rook_attacks(i, occupied) | bishop_attacks(i, occupied)
+			case PieceType.KING:
+				return KING_MASKS[i]
+
+	def attack_map(self, color: Color) -> int:
+		""" returns the bitboard of all the squares attacked by color. """
+		c = color.index
+		attacks = self._attack_maps[c]
+		if attacks is not None: return attacks
+
+		attacks = 0
+		pieces = self.occupancy[c]
+		while pieces:
+			lsb = pieces & -pieces
+			attacks |= self.attacks_from[lsb.bit_length() - 1]
+			pieces ^= lsb
+
+		self._attack_maps[c] = attacks
+		return attacks
+
+	def attackers_to(
+		self,
+		i: int,
+		color: Color,
+		occupied: int | None = None
+	) -> int:
+		"""
+		returns the bitboard of color's pieces attacking the square index i.
+		a different occupancy can be given to look through removed pieces.
+		"""
+		if occupied is None:
+			occupied = self.occupied
+
+		bb = self.bitboards
+		base = color.index*len(PIECE_TYPES)
+		queens = bb[base + PieceType.QUEEN.index]
+
+		# a pawn of color attacks i if i's pawn of the other color attacks it
+		return (
+			PAWN_MASKS[1 - color.index][i] & bb[base + PieceType.PAWN.index] |
+			KNIGHT_MASKS[i] & bb[base + PieceType.KNIGHT.index] |
+			KING_MASKS[i] & bb[base + PieceType.KING.index] |
+			rook_attacks(i, occupied) & (bb[base + PieceType.ROOK.index] | queens) |
+			bishop_attacks(i, occupied) & (bb[base + PieceType.BISHOP.index] | queens)
+		) & occupied
 
 	def move(
 		self,
@@ -234,8 +554,7 @@ class Board:
 
 	def get(self, coordinate: Coordinate) -> Square:
 		""" returns the square in the given coordinate. """
-		row, col = coordinate.regular
-		return self.board_matrix[row][col]
+		return self.squares[coordinate.index]
 
 	def __getitem__(self, coordinate: Coordinate) -> Square:
 		""" returns the square in the given coordinate. """
@@ -250,28 +569,19 @@ class Board:
 		stops when exits board or reaches a piece of any color(inclusive).
 		direction is a tuple of 2 numbers, it contains a direction-like vector
 		that corresponds to (file_direction, rank_direction)
-		like (0, 1), which means going up
+		like (0, 1), which means going up.
+		only the 8 straight and diagonal unit directions are supported.
 		"""
-		file_ord = ord(current_coordinate.file)
-		rank_ord = ord(current_coordinate.rank)
-
-		coords: list[Coordinate] = []
-
-		for i in range(1, 8):
-			f_dir, r_dir = direction
-			new_file = chr(file_ord + i*f_dir)
-			new_rank = chr(rank_ord + i*r_dir)
-			m = f'{new_file}{new_rank}'
-
-			if not Coordinate.is_valid(m): return coords
-
-			c = Coordinate(m)
-			coords.append(c)
+		d = _RAY_DIRECTION_INDICES[direction]
+		i = current_coordinate.index
+		ray = _RAY_COORDINATES[d][i]
 
-			# if reached a piece(any color), the range of attack stops
-			if self.get(c).piece: return coords
+		blockers = RAY_MASKS[d][i] & self.occupied
+		if not blockers: return list(ray)
 
-		return coords
+		# if reached a piece(any color), the range of attack stops
+		distance = (first_blocker(d, blockers) - i) // RAY_STEPS[d]
+		return list(ray[:distance])
 
 	def __repr__(self) -> str:
 		s: str = ''
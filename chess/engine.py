@@ -0,0 +1,685 @@
+import argparse
+import ctypes
+import multiprocessing
+from multiprocessing.pool import Pool
+import threading
+import time
+from chess.components import PieceType, piece_index
+from chess.evaluation import evaluate
+from chess.game.game import ChessGame, Move, PROMOTION_PIECES, STARTING_FEN
+
+MATE_SCORE: int = 100_000
+# scores beyond this are mates, the distance to mate is subtracted
+MATE_BOUND: int = MATE_SCORE - 1000
+INFINITY: int = MATE_SCORE + 1
+
+MAX_PLY: int = 128
+
+# the clock and the stop are checked every this many nodes, a power of two.
+# the search does a few thousand nodes a second, so this is about 10ms
+TIME_CHECK_NODES: int = 64
+# no iteration is started once this part of the time is used, the next
+# one would take longer than all the ones before it
+ITERATION_TIME_FRACTION: float = 0.5
+
+# piece values in centipawns for move ordering, indexed by PieceType.index
+PIECE_VALUES: tuple[int, ...] = tuple(
+	{
+		PieceType.KING: 0,
+		PieceType.QUEEN: 900,
+		PieceType.ROOK: 500,
+		PieceType.BISHOP: 330,
+		PieceType.KNIGHT: 320,
+		PieceType.PAWN: 100,
+	}[pt] for pt in PieceType
+)
+
+# transposition table entry flags
+EXACT: int = 0
+LOWER_BOUND: int = 1
+UPPER_BOUND: int = 2
+
+# positions of the scaling benchmark, (name, FEN)
+BENCHMARK_POSITIONS: list[tuple[str, str]] = [
+	('initial position', STARTING_FEN),
+	('kiwipete', 'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1'),
+	('middlegame', 'r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N2N2/PP2BPPP/R2QKB1R w KQ - 0 8'),
+]
+
+
+def encode_move(move: Move) -> int:
+	"""
+	packs a move into an int: origin index, target index and promotion.
+	unlike the move tuple it stays valid after the position changes.
+	"""
+	piece, coordinate, promotion = move
+	code = piece.coordinate.index | coordinate.index << 6
+	if promotion:
+		code |= (PROMOTION_PIECES.index(promotion) + 1) << 12
+	return code
+
+
+class SearchTimeout(Exception):
+	""" raised inside the search when the time is up or stop() was called. """
+
+
+class TranspositionTable:
+	"""
+	a fixed-size hash table of search results, indexed by the low bits
+	of the zobrist key. each slot holds one entry:
+		(key, depth, score, flag, move, age)
+	a new entry replaces the old one if it comes from a newer search,
+	is for the same position or was searched at least as deep.
+	"""
+	# rough size of one entry in bytes, used to turn megabytes into slots
+	ENTRY_SIZE: int = 128
+
+	def __init__(self, size_mb: int = 16):
+		self.resize(size_mb)
+
+	def resize(self, size_mb: int) -> None:
+		""" drops all the entries and resizes the table. """
+		slots = max(1, size_mb * 1024 * 1024 // self.ENTRY_SIZE)
+		# round down to a power of two so that the index is a bit mask
+		self.size: int = 1 << (slots.bit_length() - 1)
+		self.mask: int = self.size - 1
+		self.clear()
+
+	def clear(self) -> None:
+		self.slots: list[tuple | None] = [None] * self.size
+		self.age: int = 0
+
+	def new_search(self) -> None:
+		""" marks the entries of previous searches as replaceable. """
+		self.age = (self.age + 1) & 0xff
+
+	def probe(self, key: int) -> tuple | None:
+		entry = self.slots[key & self.mask]
+		if entry and entry[0] == key:
+			return entry
+		return None
+
+	def store(self, key: int, depth: int, score: int, flag: int, move: int) -> None:
+		i = key & self.mask
+		old = self.slots[i]
+		if old and old[0] != key and old[5] == self.age and old[1] > depth:
+			return
+		self.slots[i] = (key, depth, score, flag, move, self.age)
+
+
+class SharedTranspositionTable(TranspositionTable):
+	"""
+	a transposition table in shared memory, for searches running in several
+	processes. each slot is two 64-bit words: the key xor the packed entry,
+	and the packed entry. the slots are read and written without a lock,
+	an entry torn by two processes writing at once fails the key check
+	and is treated as a miss.
+	"""
+	ENTRY_SIZE: int = 16
+	# scores are stored with this added, to keep them positive
+	SCORE_OFFSET: int = 1 << 19
+
+	def __init__(self, size_mb: int = 16, entries: ctypes.Array | None = None):
+		""" attaches to the entries of another table, if given. """
+		if entries is None:
+			self.resize(size_mb)
+		else:
+			self._attach(entries)
+
+	def resize(self, size_mb: int) -> None:
+		slots = max(1, size_mb * 1024 * 1024 // self.ENTRY_SIZE)
+		size = 1 << (slots.bit_length() - 1)
+		self._attach(multiprocessing.RawArray(ctypes.c_uint64, 2 * size))
+
+	def _attach(self, entries: ctypes.Array) -> None:
+		self.entries: ctypes.Array = entries
+		self.size = len(entries) // 2
+		self.mask = self.size - 1
+		self.age = 0
+
+	def clear(self) -> None:
+		ctypes.memset(self.entries, 0, ctypes.sizeof(self.entries))
+		self.age = 0
+
+	def probe(self, key: int) -> tuple | None:
+		i = (key & self.mask) << 1
+		data = self.entries[i + 1]
+		if not data or self.entries[i] ^ data != key:
+			return None
+		return (
+			key,
+			data >> 16 & 0xff,
+			(data >> 34) - self.SCORE_OFFSET,
+			data >> 24 & 0b11,
+			data & 0xffff,
+			data >> 26 & 0xff,
+		)
+
+	def store(self, key: int, depth: int, score: int, flag: int, move: int) -> None:
+		i = (key & self.mask) << 1
+		old = self.entries[i + 1]
+		if (
+			old and self.entries[i] ^ old != key and
+			old >> 26 & 0xff == self.age and old >> 16 & 0xff > depth
+		):
+			return
+
+		data = (
+			move | depth << 16 | flag << 24 | self.age << 26 |
+			(score + self.SCORE_OFFSET) << 34
+		)
+		self.entries[i] = key ^ data
+		self.entries[i + 1] = data
+
+
+class Engine:
+	"""
+	iterative deepening negamax search with alpha-beta pruning,
+	a transposition table, quiescence search and move ordering by
+	the transposition table move, MVV-LVA, killer moves and history.
+	"""
+	def __init__(self, hash_mb: int = 16, tt: TranspositionTable | None = None):
+		self.hash_mb: int = hash_mb
+		self.tt: TranspositionTable = tt or TranspositionTable(hash_mb)
+		self.nodes: int = 0
+		self.depth: int = 0
+		self.score: int = 0
+		self._deadline: float | None = None
+		# no iteration starts after it
+		self._soft_deadline: float | None = None
+		# set by stop(), a new one for every search
+		self._stop_event = threading.Event()
+		self._root_best: int = 0
+
+		# parallel search, see _parallel_best_move
+		self._pool: Pool | None = None
+		self._pool_workers: int = 0
+		# set to stop the searches of all the processes
+		self._stop_flag: ctypes.c_bool | None = None
+
+	def stop(self) -> None:
+		""" stops a running search, best_move returns the best move so far. """
+		self._stop_event.set()
+		if self._stop_flag is not None:
+			self._stop_flag.value = True
+
+	def close(self) -> None:
+		""" shuts down the worker processes of the parallel search, if any. """
+		if self._pool is not None:
+			self._pool.terminate()
+			self._pool.join()
+		self._pool = None
+		self._pool_workers = 0
+
+	def best_move(
+		self,
+		game: ChessGame,
+		depth: int | None = None,
+		time_ms: int | None = None,
+		workers: int = 1,
+		stop_event: threading.Event | None = None
+	) -> Move | None:
+		"""
+		searches the position of the game and returns the best move found
+		as (piece, coordinate, promotion), or None if there are no moves.
+		the search deepens until depth is reached or time_ms runs out.
+		without both it searches to depth 4. the game is left unchanged.
+		with more than one worker the search runs in that many processes.
+		the search also stops once stop_event is set. a caller running the
+		search on another thread makes the event before starting it, so
+		that a stop that comes before the search started is not lost.
+		"""
+		if depth is None:
+			depth = MAX_PLY if time_ms else 4
+
+		# a new stop state, the one of the previous search may be set
+		self._stop_event = stop_event or threading.Event()
+		if self._stop_flag is not None:
+			self._stop_flag.value = self._stop_event.is_set()
+
+		if workers > 1:
+			return self._parallel_best_move(game, depth, time_ms, workers)
+
+		self.tt.new_search()
+		return self._iterate(game, depth, time_ms)
+
+	def _iterate(
+		self,
+		game: ChessGame,
+		depth: int,
+		time_ms: int | None,
+		depth_offset: int = 0
+	) -> Move | None:
+		"""
+		the iterative deepening loop of best_move. each iteration searches
+		depth_offset plies deeper than its number, up to MAX_PLY.
+		"""
+		self.nodes = 0
+		self.depth = 0
+		self.score = 0
+		self._deadline = self._soft_deadline = None
+		if time_ms is not None:
+			start = time.perf_counter()
+			self._deadline = start + time_ms / 1000
+			self._soft_deadline = start + time_ms / 1000 * ITERATION_TIME_FRACTION
+
+		self._killers: list[list[int]] = [[0, 0] for _ in range(MAX_PLY + 1)]
+		self._history: list[list[int]] = [[0] * 64 for _ in range(12)]
+
+		root_moves = game.legal_moves()
+		if not root_moves: return None
+
+		best: Move = root_moves[0]
+		for d in range(1, depth + 1):
+			d = min(d + depth_offset, MAX_PLY)
+			history_length = len(game.history)
+			try:
+				score = self._search(game, d, -INFINITY, INFINITY, 0)
+			except SearchTimeout:
+				# take back the moves of the unfinished iteration
+				while len(game.history) > history_length:
+					game.unmake_move()
+				break
+
+			best = self._decode(root_moves, self._root_best) or best
+			self.depth = d
+			self.score = score
+
+			# no need to look further once a mate is found
+			if abs(score) > MATE_BOUND: break
+			if self._soft_deadline is not None and time.perf_counter() > self._soft_deadline:
+				break
+
+		return best
+
+	def _parallel_best_move(
+		self,
+		game: ChessGame,
+		depth: int,
+		time_ms: int | None,
+		workers: int
+	) -> Move | None:
+		"""
+		lazy SMP: every worker process searches the whole position, and they
+		share what they find through a transposition table in shared memory,
+		so each one cuts off the parts of the tree the others already did.
+		every other worker searches one ply deeper, so that the helpers run
+		ahead of the main search instead of repeating it. once the main
+		search, of the first worker, is done the others are stopped and
+		the move of the deepest finished search is played.
+		"""
+		root_moves = game.legal_moves()
+		if not root_moves: return None
+		if game.initial_FEN is None:
+			raise ValueError('the game must be loaded from a FEN to search in parallel')
+
+		pool = self._get_pool(workers)
+		self.tt.new_search()
+		# the flag is new if the pool was just started
+		self._stop_flag.value = self._stop_event.is_set()
+
+		args = (game.initial_FEN, game.moves_played(), depth, time_ms, self.tt.age)
+		results = [
+			pool.apply_async(_worker_search, args + (worker_id,))
+			for worker_id in range(workers)
+		]
+		reports = [results[0].get()]
+		self._stop_flag.value = True
+		reports += [result.get() for result in results[1:]]
+
+		# the main search wins ties, max returns the first of equals
+		code, self.depth, self.score, _ = max(reports, key=lambda r: r[1])
+		self.nodes = sum(report[3] for report in reports)
+
+		return self._decode(root_moves, code) or root_moves[0]
+
+	def _get_pool(self, workers: int) -> Pool:
+		"""
+		returns the pool of worker processes, starting it if needed.
+		the table is moved to shared memory so that the workers see it.
+		"""
+		if self._pool is not None and self._pool_workers == workers:
+			return self._pool
+
+		self.close()
+		if not isinstance(self.tt, SharedTranspositionTable):
+			self.tt = SharedTranspositionTable(self.hash_mb)
+		self._stop_flag = multiprocessing.RawValue(ctypes.c_bool, False)
+		# the pool can be started from any thread, like the search thread
+		# of chess.uci. forking there copies locks other threads hold,
+		# like the one of stdin, and the workers deadlock on them
+		context = multiprocessing.get_context('forkserver')
+		self._pool = context.Pool(
+			workers, _init_worker, (self.tt.entries, self._stop_flag)
+		)
+		self._pool_workers = workers
+		return self._pool
+
+	def principal_variation(self, game: ChessGame, max_length: int = 32) -> list[Move]:
+		""" returns the expected line of play, read from the table. """
+		line: list[Move] = []
+		for _ in range(max_length):
+			entry = self.tt.probe(game.zobrist_key)
+			if not entry: break
+			move = self._decode(game.legal_moves(), entry[4])
+			if not move: break
+
+			line.append(move)
+			game.make_move(*move)
+
+		for _ in line:
+			game.unmake_move()
+
+		return line
+
+	@staticmethod
+	def _decode(moves: list[Move], code: int) -> Move | None:
+		for move in moves:
+			if encode_move(move) == code:
+				return move
+		return None
+
+	def _check_time(self) -> None:
+		if self._stop_event.is_set():
+			raise SearchTimeout()
+		if self._stop_flag is not None and self._stop_flag.value:
+			raise SearchTimeout()
+		if self._deadline is not None and time.perf_counter() > self._deadline:
+			raise SearchTimeout()
+
+	def _search(
+		self,
+		game: ChessGame,
+		depth: int,
+		alpha: int,
+		beta: int,
+		ply: int
+	) -> int:
+		""" negamax alpha-beta, returns the score for the player to move. """
+		self.nodes += 1
+		if not self.nodes & (TIME_CHECK_NODES - 1):
+			self._check_time()
+
+		# a repeated position is a draw, playing on would repeat it again
+		if ply > 0 and (
+			game.is_fifty_moves() or game.repetitions() or
+			game.is_insufficient_material()
+		):
+			return 0
+
+		key = game.zobrist_key
+		alpha_original = alpha
+
+		tt_move = 0
+		entry = self.tt.probe(key)
+		if entry:
+			tt_move = entry[4]
+			if ply > 0 and entry[1] >= depth:
+				score = self._score_from_tt(entry[2], ply)
+				flag = entry[3]
+				if flag == EXACT: return score
+				if flag == LOWER_BOUND and score >= beta: return score
+				if flag == UPPER_BOUND and score <= alpha: return score
+
+		in_check = game.current_player.is_in_check()
+		# look one ply further when in check, so that mates are not missed
+		if in_check and ply < MAX_PLY:
+			depth += 1
+
+		if depth <= 0 or ply >= MAX_PLY:
+			return self._quiescence(game, alpha, beta, ply)
+
+		moves = game.legal_moves()
+		if not moves:
+			# checkmate or stalemate
+			return -MATE_SCORE + ply if in_check else 0
+
+		best_score = -INFINITY
+		best_code = 0
+		for move in self._ordered(game, moves, tt_move, ply):
+			code = encode_move(move)
+			capture = self._is_capture(game, move)
+
+			game.make_move(*move)
+			score = -self._search(game, depth - 1, -beta, -alpha, ply + 1)
+			game.unmake_move()
+
+			if score > best_score:
+				best_score = score
+				best_code = code
+				if ply == 0:
+					self._root_best = code
+			if score > alpha:
+				alpha = score
+			if alpha >= beta:
+				if not capture:
+					self._remember_quiet(move, code, depth, ply)
+				break
+
+		if best_score <= alpha_original:
+			flag = UPPER_BOUND
+		elif best_score >= beta:
+			flag = LOWER_BOUND
+		else:
+			flag = EXACT
+		self.tt.store(key, depth, self._score_to_tt(best_score, ply), flag, best_code)
+
+		return best_score
+
+	def _quiescence(self, game: ChessGame, alpha: int, beta: int, ply: int) -> int:
+		""" searches captures only, until the position is quiet. """
+		self.nodes += 1
+		if not self.nodes & (TIME_CHECK_NODES - 1):
+			self._check_time()
+
+		stand_pat = evaluate(game)
+		if stand_pat >= beta: return stand_pat
+		if stand_pat > alpha:
+			alpha = stand_pat
+		if ply >= MAX_PLY: return stand_pat
+
+		captures = [m for m in game.legal_moves() if self._is_capture(game, m)]
+		captures.sort(key=lambda m: self._mvv_lva(game, m), reverse=True)
+
+		for move in captures:
+			game.make_move(*move)
+			score = -self._quiescence(game, -beta, -alpha, ply + 1)
+			game.unmake_move()
+
+			if score >= beta: return score
+			if score > alpha:
+				alpha = score
+
+		return alpha
+
+	@staticmethod
+	def _is_capture(game: ChessGame, move: Move) -> bool:
+		piece, coordinate, promotion = move
+		if promotion or game.board.squares[coordinate.index].piece:
+			return True
+		return (
+			coordinate is game.en_passant_target_square and
+			piece.piece_type == PieceType.PAWN
+		)
+
+	@staticmethod
+	def _mvv_lva(game: ChessGame, move: Move) -> int:
+		""" most valuable victim first, then least valuable attacker. """
+		piece, coordinate, promotion = move
+		victim = game.board.squares[coordinate.index].piece
+		# en passant captures a pawn
+		value = PIECE_VALUES[victim.piece_type.index] if victim else PIECE_VALUES[-1]
+		if promotion:
+			value += PIECE_VALUES[promotion.index]
+		return value * 10 - PIECE_VALUES[piece.piece_type.index] // 10
+
+	def _ordered(
+		self,
+		game: ChessGame,
+		moves: list[Move],
+		tt_move: int,
+		ply: int
+	) -> list[Move]:
+		"""
+		sorts the moves so that the best ones are searched first:
+		the table move, captures by MVV-LVA, killers and then by history.
+		"""
+		killers = self._killers[ply]
+
+		def key(move: Move) -> int:
+			code = encode_move(move)
+			if code == tt_move: return 1 << 30
+			if self._is_capture(game, move):
+				return (1 << 20) + self._mvv_lva(game, move)
+			if code == killers[0]: return 1 << 19
+			if code == killers[1]: return (1 << 19) - 1
+
+			piece, coordinate, _ = move
+			return self._history[
+				piece_index(piece.color, piece.piece_type)
+			][coordinate.index]
+
+		return sorted(moves, key=key, reverse=True)
+
+	def _remember_quiet(self, move: Move, code: int, depth: int, ply: int) -> None:
+		""" updates the killers and history of a quiet move that cut off. """
+		killers = self._killers[ply]
+		if killers[0] != code:
+			killers[1] = killers[0]
+			killers[0] = code
+
+		piece, coordinate, _ = move
+		history = self._history[piece_index(piece.color, piece.piece_type)]
+		history[coordinate.index] = min(
+			history[coordinate.index] + depth * depth, (1 << 19) - 2
+		)
+
+	@staticmethod
+	def _score_to_tt(score: int, ply: int) -> int:
+		""" mate scores are stored relative to the node, not the root. """
+		if score > MATE_BOUND: return score + ply
+		if score < -MATE_BOUND: return score - ply
+		return score
+
+	@staticmethod
+	def _score_from_tt(score: int, ply: int) -> int:
+		if score > MATE_BOUND: return score - ply
+		if score < -MATE_BOUND: return score + ply
+		return score
+
+
+# the engine and game of a worker process of the parallel search
+_worker_engine: Engine | None = None
+_worker_game: ChessGame | None = None
+
+
+def _init_worker(entries: ctypes.Array, stop_flag: ctypes.c_bool) -> None:
+	global _worker_engine, _worker_game
+	_worker_engine = Engine(tt=SharedTranspositionTable(entries=entries))
+	_worker_engine._stop_flag = stop_flag
+	_worker_game = ChessGame()
+
+
+def _worker_search(
+	fen: str,
+	moves: list[str],
+	depth: int,
+	time_ms: int | None,
+	age: int,
+	worker_id: int
+) -> tuple[int, int, int, int]:
+	"""
+	searches the position after the moves from the FEN in a worker process.
+	returns (move code, depth reached, score, nodes searched).
+	"""
+	game = _worker_game
+	game.load_FEN(fen)
+	for text in moves:
+		game.make_move(*game.parse_move(text))
+
+	engine = _worker_engine
+	engine.tt.age = age
+	engine._stop_event = threading.Event()
+	move = engine._iterate(game, depth, time_ms, depth_offset=worker_id & 1)
+
+	return (
+		encode_move(move) if move else 0,
+		engine.depth,
+		engine.score,
+		engine.nodes,
+	)
+
+
+def scaling_benchmark(depth: int, worker_counts: list[int]) -> None:
+	"""
+	times the search of the benchmark positions to the given depth
+	with each number of workers, and prints the speedup over one worker.
+	"""
+	times: dict[int, float] = {}
+	for workers in worker_counts:
+		engine = Engine()
+		# start the processes before the clock does
+		if workers > 1:
+			engine._get_pool(workers)
+		total_time = 0.0
+		total_nodes = 0
+		for name, fen in BENCHMARK_POSITIONS:
+			game = ChessGame()
+			game.load_FEN(fen)
+			engine.tt.clear()
+
+			start = time.perf_counter()
+			engine.best_move(game, depth=depth, workers=workers)
+			total_time += time.perf_counter() - start
+			total_nodes += engine.nodes
+		engine.close()
+
+		times[workers] = total_time
+		speedup = times[worker_counts[0]] / total_time
+		print(
+			f'{workers: >2} workers: {total_time: >8.2f}s to depth {depth}, ' +
+			f'{total_nodes: >9} nodes, speedup {speedup:.2f}x'
+		)
+
+
+def main():
+	parser = argparse.ArgumentParser(
+		description='search the initial position or benchmark the parallel search.'
+	)
+	parser.add_argument(
+		'-d', '--depth', type=int, default=4,
+		help='depth to search to(default: 4)'
+	)
+	parser.add_argument(
+		'-w', '--workers', type=int, default=1,
+		help='number of processes to search with(default: 1)'
+	)
+	parser.add_argument(
+		'--scaling', action='store_true',
+		help='report the time to depth with 1, 2, 4, 8 and 16 workers instead'
+	)
+	args = parser.parse_args()
+
+	if args.scaling:
+		scaling_benchmark(args.depth, [1, 2, 4, 8, 16])
+		return
+
+	game = ChessGame()
+	game.classic_setup()
+	engine = Engine()
+
+	start = time.perf_counter()
+	move = engine.best_move(game, depth=args.depth, workers=args.workers)
+	elapsed = time.perf_counter() - start
+	engine.close()
+
+	piece, coordinate, promotion = move
+	print(
+		f'best move: {piece.piece_type.name.title()} {piece.coordinate} -> {coordinate}, ' +
+		f'score {engine.score}, depth {engine.depth}, ' +
+		f'{engine.nodes} nodes in {elapsed:.2f}s'
+	)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,119 @@
+from chess.components import Board, Color, PieceType, piece_index
+from chess.game.game import ChessGame
+from chess.pst import TOTAL_PHASE
+from chess.tables import ADJACENT_FILE_MASKS, FILE_MASKS, PASSED_PAWN_MASKS
+
+_W_PAWN: int = piece_index(Color.WHITE, PieceType.PAWN)
+_B_PAWN: int = piece_index(Color.BLACK, PieceType.PAWN)
+
+# (midgame, endgame) penalties of each pawn after the first on a file,
+# and of each pawn without friendly pawns on the files next to it
+DOUBLED_PAWN: tuple[int, int] = (-10, -20)
+ISOLATED_PAWN: tuple[int, int] = (-10, -15)
+# bonuses of passed pawns, by rank counted from the pawn's own side
+PASSED_PAWN_MG: tuple[int, ...] = (0, 5, 10, 15, 25, 40, 60, 0)
+PASSED_PAWN_EG: tuple[int, ...] = (0, 10, 20, 35, 60, 90, 130, 0)
+
+
+class PawnHashTable:
+	"""
+	a fixed-size hash table of pawn structure scores, indexed by the low
+	bits of Board.pawn_key. the pawns rarely change from one position of
+	a search to the next, so most positions find their score here.
+	each slot holds one (key, midgame, endgame) entry, a new entry
+	always replaces the old one.
+	"""
+	def __init__(self, size: int = 1 << 14):
+		""" size is the number of slots, rounded down to a power of two. """
+		self.size: int = 1 << (max(1, size).bit_length() - 1)
+		self.mask: int = self.size - 1
+		self.clear()
+
+	def clear(self) -> None:
+		self.slots: list[tuple[int, int, int] | None] = [None] * self.size
+		self.probes: int = 0
+		self.hits: int = 0
+
+	@property
+	def hit_rate(self) -> float:
+		return self.hits / self.probes if self.probes else 0.0
+
+	def probe(self, key: int) -> tuple[int, int] | None:
+		""" returns the (midgame, endgame) score of the pawns, if stored. """
+		self.probes += 1
+		entry = self.slots[key & self.mask]
+		if entry and entry[0] == key:
+			self.hits += 1
+			return entry[1], entry[2]
+		return None
+
+	def store(self, key: int, mg: int, eg: int) -> None:
+		self.slots[key & self.mask] = (key, mg, eg)
+
+
+# the table evaluate uses, one per process
+pawn_table = PawnHashTable()
+
+
+def evaluate(game: ChessGame) -> int:
+	"""
+	returns the static evaluation of the position in centipawns,
+	from the point of view of the player to move. the material and
+	piece-square scores are kept by the board as the pieces move, the
+	midgame and endgame scores are blended by the game phase. the
+	pawn structure is looked up in pawn_table before it is computed.
+	"""
+	board = game.board
+	scores = pawn_table.probe(board.pawn_key)
+	if scores is None:
+		scores = pawn_structure(board)
+		pawn_table.store(board.pawn_key, *scores)
+
+	mg, eg = scores
+	mg += board.mg_score
+	eg += board.eg_score
+
+	# promotions can take the phase past the start
+	phase = min(board.phase, TOTAL_PHASE)
+	# rounded toward zero, so that a position and its color-mirrored twin
+	# score the same for the player to move
+	score = int((mg*phase + eg*(TOTAL_PHASE - phase)) / TOTAL_PHASE)
+
+	return score if game.turn == Color.WHITE else -score
+
+
+def pawn_structure(board: Board) -> tuple[int, int]:
+	"""
+	returns the (midgame, endgame) score of the pawns from white's point
+	of view: doubled and isolated pawns are penalized, passed pawns get
+	a bonus that grows as they advance.
+	"""
+	pawns = (board.bitboards[_W_PAWN], board.bitboards[_B_PAWN])
+	mg = eg = 0
+
+	for c, sign in ((0, 1), (1, -1)):
+		own, enemy = pawns[c], pawns[1 - c]
+
+		for col in range(8):
+			count = (own & FILE_MASKS[col]).bit_count()
+			if not count: continue
+
+			if count > 1:
+				mg += sign * DOUBLED_PAWN[0] * (count - 1)
+				eg += sign * DOUBLED_PAWN[1] * (count - 1)
+			if not own & ADJACENT_FILE_MASKS[col]:
+				mg += sign * ISOLATED_PAWN[0] * count
+				eg += sign * ISOLATED_PAWN[1] * count
+
+		remaining = own
+		while remaining:
+			lsb = remaining & -remaining
+			i = lsb.bit_length() - 1
+			remaining ^= lsb
+
+			if enemy & PASSED_PAWN_MASKS[c][i]: continue
+			rank = i // 8 if c == 0 else 7 - i // 8
+			mg += sign * PASSED_PAWN_MG[rank]
+			eg += sign * PASSED_PAWN_EG[rank]
+
+	return mg, eg
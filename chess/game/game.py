@@ -1,6 +1,12 @@
 import enum
-from chess.components import Board, Color, Coordinate, Piece, PieceType
-from chess.game.player import Player
+from dataclasses import dataclass, field
+from chess.components import (
+	COORDINATES, PIECE_TYPES, Board, Color, Coordinate, Piece, PieceType,
+	piece_index
+)
+from chess.game.player import DummyKing, Player
+from chess.tables import DARK_SQUARES, LIGHT_SQUARES
+from chess.zobrist import CASTLING_KEYS, EN_PASSANT_KEYS, PIECE_KEYS, SIDE_KEY
 from chess.pieces.king import King
 from chess.pieces.queen import Queen
 from chess.pieces.rook import Rook
@@ -15,6 +21,74 @@ class GameEndState(enum.Enum):
 	ONGOING = enum.auto()
 
 
+STARTING_FEN: str = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+# bits of ChessGame.castling_rights(), in FEN order
+WHITE_KINGSIDE: int = 1
+WHITE_QUEENSIDE: int = 2
+BLACK_KINGSIDE: int = 4
+BLACK_QUEENSIDE: int = 8
+
+PROMOTION_PIECES: tuple[PieceType, ...] = (
+	PieceType.QUEEN, PieceType.ROOK, PieceType.BISHOP, PieceType.KNIGHT
+)
+
+PIECE_CLASSES: dict[PieceType, type[Piece]] = {
+	PieceType.KING: King,
+	PieceType.QUEEN: Queen,
+	PieceType.ROOK: Rook,
+	PieceType.BISHOP: Bishop,
+	PieceType.KNIGHT: Knight,
+	PieceType.PAWN: Pawn,
+}
+
+# bytes of ChessGame.snapshot(), 64 squares and the state word
+SNAPSHOT_SIZE: int = 64 + 8
+
+# a move as (piece, new coordinate, promotion piece type or None)
+Move = tuple[Piece, Coordinate, PieceType | None]
+
+
+@dataclass(slots=True)
+class MoveRecord:
+	"""
+	everything ChessGame.unmake_move needs to take a move back.
+	the castling rights are the has_moved flags of the king and rooks.
+	"""
+	piece: Piece
+	origin: Coordinate
+	coordinate: Coordinate
+	had_moved: bool
+	captured: Piece | None = None
+	captured_coordinate: Coordinate | None = None
+	# where the captured piece was in its player's pieces
+	captured_index: int = 0
+	promoted_piece: Piece | None = None
+	# where the promoted pawn was in its player's pieces
+	pawn_index: int = 0
+	rook: Piece | None = None
+	rook_origin: Coordinate | None = None
+	rook_had_moved: bool = False
+	en_passant_target_square: Coordinate | None = None
+	en_passant_pawns: list[Piece] = field(default_factory=list)
+	state_key: int = 0
+	halfmove_clock: int = 0
+	# the zobrist key of the position before the move
+	zobrist_key: int = 0
+
+
+def long_algebraic(
+	origin: Coordinate,
+	coordinate: Coordinate,
+	promotion: PieceType | None = None
+) -> str:
+	""" returns a move in long algebraic notation, like 'e2e4' or 'e7e8q'. """
+	s = f'{origin.file}{origin.rank}{coordinate.file}{coordinate.rank}'
+	if promotion:
+		s += promotion.value
+	return s
+
+
 class ChessGame:
 	def __init__(self) -> None:
 		self.board = Board()
@@ -32,123 +106,501 @@ class ChessGame:
 		self.en_passant_target_square: Coordinate | None = None
 		self.en_passant_pawns: list[Piece] = []
 
+		# undo stack of the moves played since the last FEN load
+		self.history: list[MoveRecord] = []
+		# the FEN the game was last loaded from, history starts from it
+		self.initial_FEN: str | None = None
+
+		# plies since the last capture or pawn move, for the fifty-move rule
+		self.halfmove_clock: int = 0
+		# starts at 1 and goes up after each move of black
+		self.fullmove_number: int = 1
+
+		# pieces taken off the board by destroy_all_pieces, reused by
+		# load_FEN. indexed by piece_index
+		self._piece_pool: list[list[Piece]] = [[] for _ in range(12)]
+
+		# cached for the current position, until a move, undo or FEN load
+		self._valid_moves_cached: bool = False
+		# the legal moves of the player to move, None until asked for
+		self._legal_moves: list[Move] | None = None
+		self._end_state: GameEndState | None = None
+
+		# the part of the zobrist key that is not on the board:
+		# side to move, castling rights and en passant file
+		self._state_key: int = 0
+
 	@property
 	def current_player(self) -> Player:
-		if self.turn == Color.WHITE:
+		return self.get_player(self.turn)
+
+	def get_player(self, color: Color) -> Player:
+		""" returns the player of the given color, the owner of its pieces. """
+		if color == Color.WHITE:
 			return self.white_p
 		else:
 			return self.black_p
 
+	@property
+	def zobrist_key(self) -> int:
+		"""
+		64-bit zobrist hash of the position, covering the pieces,
+		the side to move, castling rights and the en passant file.
+		kept up to date incrementally by the board and make_move.
+		"""
+		return self.board.zobrist_key ^ self._state_key
+
+	def compute_zobrist_key(self) -> int:
+		""" computes the zobrist key from scratch, same as zobrist_key. """
+		key = 0
+		for square in self.board.squares:
+			p = square.piece
+			if p:
+				key ^= PIECE_KEYS[piece_index(p.color, p.piece_type)][square.coordinate.index]
+
+		return key ^ self._compute_state_key()
+
+	def _compute_state_key(self) -> int:
+		key = CASTLING_KEYS[self.castling_rights()]
+		if self.turn == Color.BLACK:
+			key ^= SIDE_KEY
+		if self.en_passant_target_square:
+			key ^= EN_PASSANT_KEYS[self.en_passant_target_square.col]
+		return key
+
+	def castling_rights(self) -> int:
+		"""
+		returns the castling rights as a bitmask of WHITE_KINGSIDE,
+		WHITE_QUEENSIDE, BLACK_KINGSIDE and BLACK_QUEENSIDE.
+		a right is kept while the king and that rook have not moved.
+		"""
+		rights = 0
+		for player, kingside, queenside in (
+			(self.white_p, WHITE_KINGSIDE, WHITE_QUEENSIDE),
+			(self.black_p, BLACK_KINGSIDE, BLACK_QUEENSIDE),
+		):
+			king = player.king
+			if isinstance(king, DummyKing) or king.has_moved: continue
+
+			for right, corner in ((kingside, 7), (queenside, 0)):
+				rook = self.board.squares[king.coordinate.row*8 + corner].piece
+				if (
+					rook and rook.piece_type == PieceType.ROOK and
+					rook.color == player.color and not rook.has_moved
+				):
+					rights |= right
+
+		return rights
+
+	def update_valid_moves(self) -> None:
+		"""
+		updates the valid moves of both players.
+		en passant captures are only available to the player to move.
+		does nothing if they are up to date with the position.
+		"""
+		if self._valid_moves_cached: return
+
+		if self._legal_moves is None:
+			self.current_player.update_valid_moves(self.en_passant_target_square)
+		self.current_player.opponent.update_valid_moves()
+		self._valid_moves_cached = True
+
+	def _invalidate_cache(self) -> None:
+		""" forgets what was cached for the position, after it changed. """
+		self._valid_moves_cached = False
+		self._legal_moves = None
+		self._end_state = None
+
+	def legal_moves(self) -> list[Move]:
+		"""
+		returns all the legal moves of the player to move.
+		pawn moves to the last rank come once per promotion piece.
+		the moves are generated once per position, each call gets a copy.
+		"""
+		if self._legal_moves is not None:
+			return self._legal_moves.copy()
+
+		player = self.current_player
+		if not self._valid_moves_cached:
+			player.update_valid_moves(self.en_passant_target_square)
+
+		moves: list[Move] = []
+		for piece in player.pieces:
+			promotes = piece.piece_type == PieceType.PAWN
+			for coordinate in piece.valid_moves:
+				if promotes and coordinate.rank in ('1', '8'):
+					for promotion in PROMOTION_PIECES:
+						moves.append((piece, coordinate, promotion))
+				else:
+					moves.append((piece, coordinate, None))
+
+		self._legal_moves = moves
+		return moves.copy()
+
+	def parse_move(self, text: str) -> Move | None:
+		"""
+		returns the legal move given in long algebraic notation,
+		like 'e2e4' or 'e7e8q', or None if there is no such move.
+		"""
+		for move in self.legal_moves():
+			piece, coordinate, promotion = move
+			if long_algebraic(piece.coordinate, coordinate, promotion) == text:
+				return move
+		return None
+
+	def moves_played(self) -> list[str]:
+		""" returns the moves of self.history in long algebraic notation. """
+		return [
+			long_algebraic(
+				record.origin,
+				record.coordinate,
+				record.promoted_piece.piece_type if record.promoted_piece else None
+			)
+			for record in self.history
+		]
+
+	def perft(self, depth: int) -> int:
+		"""
+		counts the leaf nodes of the legal move tree of the given depth.
+		comparing with known counts validates the move generation.
+		"""
+		if depth == 0: return 1
+
+		moves = self.legal_moves()
+		# no need to play the moves of the last ply
+		if depth == 1: return len(moves)
+
+		nodes = 0
+		for piece, coordinate, promotion in moves:
+			self.make_move(piece, coordinate, promotion)
+			nodes += self.perft(depth-1)
+			self.unmake_move()
+
+		return nodes
+
+	def divide(self, depth: int) -> dict[str, int]:
+		"""
+		returns the perft(depth-1) of each legal move, keyed by the move
+		in long algebraic notation. useful to find move generation bugs.
+		"""
+		result: dict[str, int] = {}
+		for piece, coordinate, promotion in self.legal_moves():
+			name = long_algebraic(piece.coordinate, coordinate, promotion)
+
+			self.make_move(piece, coordinate, promotion)
+			result[name] = self.perft(depth-1)
+			self.unmake_move()
+
+		return result
+
 	def change_turns(self):
 		""" changes the player's turns, from white to black or vice versa. """
 		self.turn = ~self.turn
 
 	def classic_setup(self) -> None:
-		self.load_FEN('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1')
+		self.load_FEN(STARTING_FEN)
 
 	def destroy_all_pieces(self):
-		self.white_p.pieces = []
-		self.black_p.pieces = []
-		for row in self.board.board_matrix:
-			for square in row:
-				self.board.remove(square.coordinate)
+		"""
+		takes all the pieces off the board. they are kept in
+		self._piece_pool, for load_FEN to reuse.
+		"""
+		for player in (self.white_p, self.black_p):
+			for piece in player.pieces:
+				self._piece_pool[piece_index(piece.color, piece.piece_type)].append(piece)
+			player.pieces = []
+
+		# the captured pieces and promoted pawns of the moves played
+		for record in self.history:
+			for piece in (record.captured, record.promoted_piece and record.piece):
+				if piece:
+					self._piece_pool[piece_index(piece.color, piece.piece_type)].append(piece)
+
+		self.board.clear()
+		self._invalidate_cache()
+
+	def _take_piece(
+		self,
+		player: Player,
+		piece_type: PieceType,
+		coordinate: Coordinate
+	) -> Piece | None:
+		"""
+		returns a piece of the pool, set up as a new piece of the player
+		on coordinate but not yet on the board. if the pool has no such
+		piece, a new one is made on the board and None is returned.
+		"""
+		pool = self._piece_pool[piece_index(player.color, piece_type)]
+		if not pool:
+			PIECE_CLASSES[piece_type](player, coordinate)
+			return None
+
+		piece = pool.pop()
+		piece.coordinate = coordinate
+		piece.has_moved = False
+		piece.valid_moves = []
+		player.pieces.append(piece)
+		return piece
 
 	def load_FEN(self, FEN: str):
 		"""
-		this method will load the game based on the given FEN notation. 
-		"""
-		def reset_game():
-			# reset game
-			self.destroy_all_pieces()
-			self.turn = Color.WHITE
-
-		def place_pieces(fen_placements: str):
-			# fen_placements is the first field of FEN
-			p_placements_ranks: list[str] = fen_placements.split('/')
-
-			for rank, rank_pieces in zip('87654321', p_placements_ranks):
-				file = 'a'
-				for piece in rank_pieces:
-					# can be 'KQRBNPkqrbnp' or a number between 1 and 8
-					# the number denotes the number of consecutive empty squares
-					if piece in '87654321':
-						new_f_ord = ord(file) + int(piece)
-						file = chr(new_f_ord)
-						continue
-
-					if piece.isupper():
-						player = self.white_p
-					else:
-						player = self.black_p
-
-					coord = Coordinate(f'{file}{rank}')
-
-					if piece in 'Kk':
-						King(player, coord)
-					elif piece in 'Qq':
-						Queen(player, coord)
-					elif piece in 'Rr':
-						Rook(player, coord)
-					elif piece in 'Bb':
-						Bishop(player, coord)
-					elif piece in 'Nn':
-						Knight(player, coord)
-					elif piece in 'Pp':
-						Pawn(player, coord)
-
-					# move to next file
-					file = chr(ord(file) + 1)
-
-		def handle_turn(fen_turn: str):
-			if fen_turn == 'b':
-				self.change_turns()
-
-		def handle_castle_moves(fen_castle_field: str) -> None:
-			# k means kingside, q means queenside
-			to_disable: list[str] = ['K', 'Q', 'k', 'q']
-			for cr in fen_castle_field:
-				if cr in to_disable:
-					to_disable.remove(cr)
-
-			for move in to_disable:
-				if move.isupper():
-					player = self.white_p
-				else:
-					player = self.black_p
-
-				if move in 'Kk':
-					rook_file = 'h'
-				if move in 'Qq':
-					rook_file = 'a'
-
-				for p in player.pieces:
-					if p.piece_type != PieceType.ROOK: continue
-					if p.coordinate.file != rook_file: continue
-					p.has_moved = True
-
+		this method will load the game based on the given FEN notation.
+		the pieces, turn, castling rights, en passant target square and
+		the clocks are restored in one pass, the clocks may be left out
+		like in EPD. the pieces of the previous position are reused.
+		raises ValueError if the FEN is malformed.
+		"""
 		fen_fields: list[str] = FEN.split()
 		# 0: piece placements, from rank 8 to 1
 		# 1: 'w' or 'b', current player's turn
 		# 2: castling availablity, first white's then black's or -
-		# 3: en passant target square
-		# 4, 5 are not important really
-
-		reset_game()
-
-		place_pieces(fen_fields[0])
+		# 3: en passant target square or -
+		# 4: halfmove clock, plies since the last capture or pawn move
+		# 5: fullmove number, goes up after each move of black
+		if len(fen_fields) < 4 or fen_fields[1] not in ('w', 'b'):
+			raise ValueError(f'invalid FEN: {FEN!r}')
+		placements, turn, castling, en_passant = fen_fields[:4]
+
+		ranks: list[str] = placements.split('/')
+		if len(ranks) != 8:
+			raise ValueError(f'FEN should have 8 ranks: {FEN!r}')
+
+		# (square index, piece index) of every piece
+		pieces: list[tuple[int, int]] = []
+		for row, rank_pieces in zip(range(7, -1, -1), ranks):
+			col = 0
+			for char in rank_pieces:
+				# the number denotes the number of consecutive empty squares
+				if char in '12345678':
+					col += int(char)
+					continue
+
+				if col > 7 or char.lower() not in 'kqrbnp':
+					raise ValueError(f'invalid rank {rank_pieces!r} in FEN: {FEN!r}')
+
+				color = Color.WHITE if char.isupper() else Color.BLACK
+				pieces.append((row*8 + col, piece_index(color, PieceType(char.lower()))))
+
+				# move to next file
+				col += 1
+
+			if col != 8:
+				raise ValueError(f'invalid rank {rank_pieces!r} in FEN: {FEN!r}')
+
+		if en_passant != '-' and not Coordinate.is_valid(en_passant):
+			raise ValueError(f'invalid en passant square in FEN: {FEN!r}')
+
+		self._set_position(
+			pieces,
+			Color.WHITE if turn == 'w' else Color.BLACK,
+			castling,
+			Coordinate(en_passant) if en_passant != '-' else None,
+			int(fen_fields[4]) if len(fen_fields) > 4 else 0,
+			int(fen_fields[5]) if len(fen_fields) > 5 else 1
+		)
+		self.initial_FEN = FEN
+
+	def _set_position(
+		self,
+		pieces: list[tuple[int, int]],
+		turn: Color,
+		castling: str,
+		en_passant: Coordinate | None,
+		halfmove_clock: int,
+		fullmove_number: int
+	) -> None:
+		"""
+		sets up a position, for load_FEN and restore. pieces are
+		(square index, piece index) and castling is a FEN castling field.
+		the pieces of the previous position are reused. raises ValueError,
+		before anything changed, if a side has more than one king or the
+		en passant square is not behind a pawn that just moved two squares.
+		a side without a king plays with a dummy king, see Player.set_king.
+		"""
+		for color in Color:
+			king = piece_index(color, PieceType.KING)
+			kings = sum(1 for _, p_index in pieces if p_index == king)
+			if kings > 1:
+				raise ValueError(f'{color.name.lower()} should have one king, not {kings}')
+
+		# the square the pawn skipped, on rank 6 for white to move, 3 for black
+		if en_passant and en_passant.row != (5 if turn == Color.WHITE else 2):
+			raise ValueError(
+				f'invalid en passant square {en_passant} with ' +
+				f'{turn.name.lower()} to move'
+			)
+
+		# reset game
+		self.destroy_all_pieces()
+		self.turn = turn
+		self.en_passant_target_square = None
+		self.en_passant_pawns = []
+		self.history = []
+
+		# the pieces from the pool, put on the board all at once
+		pooled: list[Piece] = []
+		for i, p_index in pieces:
+			color_index, type_index = divmod(p_index, len(PIECE_TYPES))
+			piece = self._take_piece(
+				self.black_p if color_index else self.white_p,
+				PIECE_TYPES[type_index],
+				COORDINATES[i]
+			)
+			if piece:
+				pooled.append(piece)
+
+		self.board.set_pieces(pooled)
 
 		self.white_p.set_king()
 		self.black_p.set_king()
 
-		handle_turn(fen_fields[1])
+		self._set_castling_rights(castling)
+
+		if en_passant:
+			self.handle_en_passant_target(en_passant)
+
+		self.halfmove_clock = halfmove_clock
+		self.fullmove_number = fullmove_number
+
+		self._state_key = self._compute_state_key()
+		self._invalidate_cache()
+
+	def snapshot(self) -> bytes:
+		"""
+		returns the position packed in SNAPSHOT_SIZE bytes: one byte per
+		square, 0 if empty or else the piece index + 1, and a 64-bit state
+		word of the side to move, castling rights, en passant square and
+		the clocks. restore sets the position back up from it.
+		"""
+		squares = bytearray(64)
+		for p_index, bitboard in enumerate(self.board.bitboards):
+			while bitboard:
+				lsb = bitboard & -bitboard
+				squares[lsb.bit_length() - 1] = p_index + 1
+				bitboard ^= lsb
+
+		target = self.en_passant_target_square
+		state = (
+			self.turn.index |
+			self.castling_rights() << 1 |
+			(target.index + 1 if target else 0) << 5 |
+			min(self.halfmove_clock, 0xffff) << 12 |
+			min(self.fullmove_number, 0xffff) << 28
+		)
+
+		return bytes(squares) + state.to_bytes(8, 'little')
+
+	def restore(self, snapshot: bytes) -> None:
+		"""
+		sets up the position of a snapshot, like load_FEN does for a FEN.
+		raises ValueError if it is not a snapshot.
+		"""
+		if len(snapshot) != SNAPSHOT_SIZE:
+			raise ValueError(f'a snapshot is {SNAPSHOT_SIZE} bytes, not {len(snapshot)}')
+
+		pieces = [(i, code - 1) for i, code in enumerate(snapshot[:64]) if code]
+		if any(p_index >= 2 * len(PIECE_TYPES) for _, p_index in pieces):
+			raise ValueError('invalid piece in snapshot')
+		state = int.from_bytes(snapshot[64:], 'little')
+
+		rights = state >> 1 & 0b1111
+		castling = ''.join(
+			letter for right, letter in (
+				(WHITE_KINGSIDE, 'K'), (WHITE_QUEENSIDE, 'Q'),
+				(BLACK_KINGSIDE, 'k'), (BLACK_QUEENSIDE, 'q'),
+			) if rights & right
+		)
+		en_passant = state >> 5 & 0x7f
+
+		self._set_position(
+			pieces,
+			Color.BLACK if state & 1 else Color.WHITE,
+			castling,
+			COORDINATES[en_passant - 1] if en_passant else None,
+			state >> 12 & 0xffff,
+			state >> 28 & 0xffff
+		)
+		self.initial_FEN = self.to_FEN()
+
+	def _set_castling_rights(self, fen_castle_field: str) -> None:
+		"""
+		sets the has_moved flags of the kings and rooks so that
+		castling_rights() matches the castling field of a FEN.
+		"""
+		# k means kingside, q means queenside
+		for player, kingside, queenside in (
+			(self.white_p, 'K', 'Q'),
+			(self.black_p, 'k', 'q'),
+		):
+			king = player.king
+			if isinstance(king, DummyKing): continue
+
+			home_row = 0 if player.color == Color.WHITE else 7
+			king.has_moved = king.coordinate.index != home_row*8 + 4
+
+			for p in player.pieces:
+				if p.piece_type != PieceType.ROOK: continue
+				if p.coordinate.index == home_row*8 + 7:
+					p.has_moved = kingside not in fen_castle_field
+				elif p.coordinate.index == home_row*8:
+					p.has_moved = queenside not in fen_castle_field
+				else:
+					p.has_moved = True
+
+	def to_FEN(self) -> str:
+		""" returns the FEN notation of the current position. """
+		ranks: list[str] = []
+		for row in reversed(self.board.board_matrix):
+			rank = ''
+			empty = 0
+			for square in row:
+				piece = square.piece
+				if not piece:
+					empty += 1
+					continue
+
+				if empty:
+					rank += str(empty)
+					empty = 0
+				letter = piece.piece_type.value
+				rank += letter.upper() if piece.color == Color.WHITE else letter
+
+			if empty:
+				rank += str(empty)
+			ranks.append(rank)
+
+		rights = self.castling_rights()
+		castling = ''.join(
+			letter for right, letter in (
+				(WHITE_KINGSIDE, 'K'), (WHITE_QUEENSIDE, 'Q'),
+				(BLACK_KINGSIDE, 'k'), (BLACK_QUEENSIDE, 'q'),
+			) if rights & right
+		) or '-'
+
+		en_passant = '-'
+		if self.en_passant_target_square:
+			target = self.en_passant_target_square
+			en_passant = f'{target.file}{target.rank}'
 
-		# handling castle moves
-		handle_castle_moves(fen_fields[2])
+		turn = 'w' if self.turn == Color.WHITE else 'b'
 
-		# en passant
-		#fen_fields[3]
+		return (
+			f'{"/".join(ranks)} {turn} {castling} {en_passant} ' +
+			f'{self.halfmove_clock} {self.fullmove_number}'
+		)
 
 	def check_state(self) -> GameEndState:
+		"""
+		returns the state of the game in the current position.
+		it is computed, and printed if the game is over, once per position.
+		"""
+		if self._end_state is None:
+			self.update_valid_moves()
+			self._end_state = self._compute_state()
+
+		return self._end_state
+
+	def _compute_state(self) -> GameEndState:
 		if self.white_p.is_checkmated():
 			print('Black won!')
 			return GameEndState.BLACK_WON
@@ -160,49 +612,87 @@ class ChessGame:
 			print('Stalemate(Draw)')
 			return GameEndState.DRAW
 
+		if self.is_threefold_repetition():
+			print('Threefold repetition(Draw)')
+			return GameEndState.DRAW
+
+		if self.is_fifty_moves():
+			print('Fifty-move rule(Draw)')
+			return GameEndState.DRAW
+
+		if self.is_insufficient_material():
+			print('Insufficient material(Draw)')
+			return GameEndState.DRAW
+
 		return GameEndState.ONGOING
 
-	def handle_en_passant(self, piece: Piece, coordinate: Coordinate) -> None:
-		# if this move was a pawn trying to escape, set the en passant square
-		if piece.piece_type != PieceType.PAWN: return
+	def repetitions(self) -> int:
+		"""
+		returns how many times the current position occurred before.
+		only the positions since the last capture or pawn move are
+		looked at, none of the positions before them can come back.
+		"""
+		key = self.zobrist_key
+		plies = min(self.halfmove_clock, len(self.history))
 
-		opponent_pawns: list[Piece] = self.current_player.opponent.potential_en_passant_pawns()
-		if not opponent_pawns: return
+		# the same player is to move every other ply
+		count = 0
+		for i in range(2, plies + 1, 2):
+			if self.history[-i].zobrist_key == key:
+				count += 1
 
-		if coordinate.rank != opponent_pawns[0].coordinate.rank: return
+		return count
 
-		adjacent_files = []
-		if (f:=chr(ord(coordinate.file)+1)) in 'abcdefgh':
-			adjacent_files.append(f)
-		if (f:=chr(ord(coordinate.file)-1)) in 'abcdefgh':
-			adjacent_files.append(f)
+	def is_threefold_repetition(self) -> bool:
+		return self.repetitions() >= 2
 
-		adjacent_coords = []
-		for file in adjacent_files:
-			adjacent_coords.append(Coordinate(f'{file}{coordinate.rank}'))
+	def is_fifty_moves(self) -> bool:
+		""" fifty moves of each player without a capture or a pawn move. """
+		return self.halfmove_clock >= 100
 
-		en_passant_pawns: list[Piece] = []
-		for op_pawn in opponent_pawns:
-			if op_pawn.coordinate in adjacent_coords:
-				en_passant_pawns.append(op_pawn)
+	def is_insufficient_material(self) -> bool:
+		"""
+		returns wether neither player can checkmate, with any moves:
+		only kings and one minor piece, or only kings and bishops
+		that are all on squares of the same color.
+		"""
+		bitboards = self.board.bitboards
+		knights = bishops = 0
+		for color in Color:
+			for piece_type in (PieceType.PAWN, PieceType.ROOK, PieceType.QUEEN):
+				if bitboards[piece_index(color, piece_type)]: return False
+			knights |= bitboards[piece_index(color, PieceType.KNIGHT)]
+			bishops |= bitboards[piece_index(color, PieceType.BISHOP)]
 
-		if not en_passant_pawns: return
+		if (knights | bishops).bit_count() <= 1: return True
+		if knights: return False
 
-		# this was a move, that enabled en passant on the next move
-		# so
-		new_rank: str
-		if self.current_player.color == Color.WHITE:
-			new_rank = chr(ord(piece.coordinate.rank)+1)
-		else:
-			new_rank = chr(ord(piece.coordinate.rank)-1)
+		return not (bishops & LIGHT_SQUARES) or not (bishops & DARK_SQUARES)
 
+	def handle_en_passant(self, piece: Piece, origin: Coordinate) -> None:
+		"""
+		enables en passant for the next move if the given piece is a pawn
+		that just moved two squares from origin.
+		"""
+		# if this move was a pawn trying to escape, set the en passant square
+		if piece.piece_type != PieceType.PAWN: return
+		if abs(piece.coordinate.row - origin.row) != 2: return
 
-		self.en_passant_target_square = Coordinate(
-			f'{piece.coordinate.file}{new_rank}'
+		# the square the pawn skipped
+		self.handle_en_passant_target(
+			COORDINATES[(piece.coordinate.index + origin.index)//2]
 		)
 
+	def handle_en_passant_target(self, target: Coordinate) -> None:
+		"""
+		sets the en passant target square for the player to move,
+		only if some of its pawns can capture there.
+		"""
+		en_passant_pawns: list[Piece] = self.current_player.en_passant_capturers(target)
+		if not en_passant_pawns: return
+
+		self.en_passant_target_square = target
 		self.en_passant_pawns = en_passant_pawns
-		self.can_en_passant = True
 
 	def get_rook_castle_move(
 		self, piece: Piece, coordinate: Coordinate
@@ -212,32 +702,38 @@ class ChessGame:
 		based on the given piece(king) and its new coordinate.
 		else returns None.
 		"""
+		if piece.piece_type != PieceType.KING: return None
 
-		king = self.current_player.king
-		if piece != king: return None
-
-		castle_moves = self.current_player.castle_moves()
-		if not castle_moves: return None
+		# only castling moves the king two files
+		file_diff = coordinate.col - piece.coordinate.col
+		if abs(file_diff) != 2: return None
 
-		for moves_pair in castle_moves:
-			_, king_move, rook, rook_move = moves_pair
-
-			if coordinate == king_move:
-				return (rook, rook_move)
+		if file_diff > 0:
+			rook_origin, rook_move = coordinate.index + 1, coordinate.index - 1
+		else:
+			rook_origin, rook_move = coordinate.index - 2, coordinate.index + 1
 
-		return None
+		rook: Piece | None = self.board.squares[rook_origin].piece
+		if not rook: return None
 
-	def pawn_promotion(self, piece: Piece, coordinate: Coordinate) -> bool:
-		""" checks pawn promotion and returns wether it happened or not. """
-		if piece.piece_type != PieceType.PAWN: return False
+		return (rook, COORDINATES[rook_move])
 
-		if coordinate.rank not in ('1', '8'): return False
+	def pawn_promotion(self, piece: Piece, coordinate: Coordinate) -> int | None:
+		"""
+		checks pawn promotion and returns the index the pawn had in its
+		player's pieces, or None if it did not happen.
+		"""
+		if not self.is_promotion(piece, coordinate): return None
 
 		# remove pawn from board and player's pieces
-		piece.player.remove_piece(piece)
+		index = self.get_player(piece.color).remove_piece(piece)
 		self.board.remove(coordinate)
 
-		return True
+		return index
+
+	def is_promotion(self, piece: Piece, coordinate: Coordinate) -> bool:
+		""" returns wether moving piece to coordinate promotes a pawn. """
+		return piece.piece_type == PieceType.PAWN and coordinate.rank in ('1', '8')
 
 	def set_promotion_piece(self):
 		while True:
@@ -254,56 +750,83 @@ class ChessGame:
 
 			break
 
-	def move(self, piece: Piece, coordinate: Coordinate):
+	def move(
+		self,
+		piece: Piece,
+		coordinate: Coordinate,
+		promotion: PieceType | None = None
+	):
 		"""
 		moves the given piece to the given coordinate.
 		handles castling moves.
 		handles captures of opponent pieces.
+		promotion is the piece type a pawn promotes to, if None
+		the player is asked with set_promotion_piece().
 		"""
 		if not (piece and coordinate):
 			print('wrong inputs!')
 			return
 
-		can_en_passant: bool = False
-		if self.en_passant_target_square:
-			can_en_passant = True
+		if promotion is None and self.is_promotion(piece, coordinate):
+			self.set_promotion_piece()
+			promotion = self.promotion_piece
 
-		# make en passant happen in the next move, if possible
-		self.handle_en_passant(piece, coordinate)
-
-		if can_en_passant:
-			# en passant is happeing if
-			if piece in self.en_passant_pawns and coordinate == self.en_passant_target_square:
-				# remove the enemy pawn
-				if self.current_player.color == Color.WHITE:
-					rank = chr(ord(coordinate.rank)-1)
-				else:
-					rank = chr(ord(coordinate.rank)+1)
-				pawn_coord: Coordinate = Coordinate(f'{coordinate.file}{rank}')
-				op_pawn: Piece = self.board.get(pawn_coord).piece
-				self.board.remove(pawn_coord)
-				self.current_player.opponent.remove_piece(op_pawn)
+		self.make_move(piece, coordinate, promotion)
 
-			# disable en passant, either way
-			self.en_passant_target_square = None
-			self.en_passant_pawns = []
+	def make_move(
+		self,
+		piece: Piece,
+		coordinate: Coordinate,
+		promotion: PieceType | None = None
+	) -> MoveRecord:
+		"""
+		plays the given move and pushes a record of it on self.history,
+		so that unmake_move can take it back. the move is assumed legal.
+		a promoting pawn becomes a queen if promotion is not given.
+		"""
+		record = MoveRecord(
+			piece=piece,
+			origin=piece.coordinate,
+			coordinate=coordinate,
+			had_moved=piece.has_moved,
+			en_passant_target_square=self.en_passant_target_square,
+			en_passant_pawns=self.en_passant_pawns,
+			state_key=self._state_key,
+			halfmove_clock=self.halfmove_clock,
+			zobrist_key=self.zobrist_key,
+		)
+		castling_rights: int = self.castling_rights()
+
+		# en passant is happeing if
+		if piece in self.en_passant_pawns and coordinate == self.en_passant_target_square:
+			# remove the enemy pawn
+			if self.current_player.color == Color.WHITE:
+				pawn_coord: Coordinate = COORDINATES[coordinate.index - 8]
+			else:
+				pawn_coord = COORDINATES[coordinate.index + 8]
+			op_pawn: Piece = self.board.get(pawn_coord).piece
+			self.board.remove(pawn_coord)
+			record.captured_index = self.current_player.opponent.remove_piece(op_pawn)
+
+			record.captured = op_pawn
+			record.captured_coordinate = pawn_coord
+
+		# disable en passant, either way
+		self.en_passant_target_square = None
+		self.en_passant_pawns = []
 
 		# if castling, move the rook too
 		rook_castle_move = self.get_rook_castle_move(piece, coordinate)
 		if rook_castle_move:
 			rook, rook_move = rook_castle_move
+			record.rook = rook
+			record.rook_origin = rook.coordinate
+			record.rook_had_moved = rook.has_moved
 			self.board.move(rook, rook_move)
-			# the king
-			self.board.move(piece, coordinate)
-			self.change_turns()
-			return
 
 		# regular moves
 		opponent_piece: Piece | None = self.board.get(coordinate).piece
 
-		if opponent_piece:
-			opponent: Player = opponent_piece.player
-
 		# removes opponent's piece from board, if any
 		# or just moves the piece
 		self.board.move(piece, coordinate)
@@ -311,25 +834,97 @@ class ChessGame:
 		# capturing
 		if opponent_piece:
 			# remove piece from opponent's(player) pieces
-			opponent.remove_piece(opponent_piece)
+			record.captured_index = self.current_player.opponent.remove_piece(opponent_piece)
+			record.captured = opponent_piece
+			record.captured_coordinate = coordinate
 
 		# pawn promotion
-		if self.pawn_promotion(piece, coordinate):
-			self.set_promotion_piece()
-
-			match self.promotion_piece:
-				case PieceType.QUEEN:
-					Queen(piece.player, coordinate)
-				case PieceType.ROOK:
-					Rook(piece.player, coordinate)
-				case PieceType.BISHOP:
-					Bishop(piece.player, coordinate)
-				case PieceType.KNIGHT:
-					Knight(piece.player, coordinate)
+		pawn_index = self.pawn_promotion(piece, coordinate)
+		if pawn_index is not None:
+			record.pawn_index = pawn_index
+			self.promotion_piece = promotion or PieceType.QUEEN
+
+			# a piece of the pool if there is one, unmake_move gives it back
+			if self._piece_pool[piece_index(piece.color, self.promotion_piece)]:
+				promoted = self._take_piece(self.current_player, self.promotion_piece, coordinate)
+				self.board.put(promoted, coordinate)
+			else:
+				promoted = PIECE_CLASSES[self.promotion_piece](self.current_player, coordinate)
+			record.promoted_piece = promoted
 
 		# switch turns
 		self.change_turns()
 
+		# make en passant happen in the next move, if possible
+		self.handle_en_passant(piece, record.origin)
+
+		# update the zobrist key of the state, the board updated the pieces
+		state_key = self._state_key ^ SIDE_KEY
+		if record.en_passant_target_square:
+			state_key ^= EN_PASSANT_KEYS[record.en_passant_target_square.col]
+		if self.en_passant_target_square:
+			state_key ^= EN_PASSANT_KEYS[self.en_passant_target_square.col]
+		if piece.piece_type in (PieceType.KING, PieceType.ROOK) or record.captured:
+			state_key ^= CASTLING_KEYS[castling_rights]
+			state_key ^= CASTLING_KEYS[self.castling_rights()]
+		self._state_key = state_key
+
+		if piece.piece_type == PieceType.PAWN or record.captured:
+			self.halfmove_clock = 0
+		else:
+			self.halfmove_clock += 1
+		if piece.color == Color.BLACK:
+			self.fullmove_number += 1
+
+		self._invalidate_cache()
+		self.history.append(record)
+		return record
+
+	def unmake_move(self) -> MoveRecord | None:
+		"""
+		takes back the last move of self.history and restores the game
+		exactly as it was before it. returns the record of that move,
+		or None if there is nothing to take back.
+		"""
+		if not self.history: return None
+		record = self.history.pop()
+
+		self.change_turns()
+
+		piece = record.piece
+		if record.promoted_piece:
+			# the pawn comes back in place of the promoted piece
+			promoted = record.promoted_piece
+			self.current_player.remove_piece(promoted)
+			self._piece_pool[piece_index(promoted.color, promoted.piece_type)].append(promoted)
+			self.board.remove(record.coordinate)
+			self.current_player.add_piece(piece, record.pawn_index)
+		else:
+			self.board.remove(record.coordinate)
+
+		self.board.put(piece, record.origin)
+		piece.has_moved = record.had_moved
+
+		if record.rook:
+			self.board.move(record.rook, record.rook_origin, examine_mode=True)
+			record.rook.has_moved = record.rook_had_moved
+
+		if record.captured:
+			self.board.put(record.captured, record.captured_coordinate)
+			self.current_player.opponent.add_piece(record.captured, record.captured_index)
+
+		self.en_passant_target_square = record.en_passant_target_square
+		self.en_passant_pawns = record.en_passant_pawns
+		self._state_key = record.state_key
+
+		self.halfmove_clock = record.halfmove_clock
+		if piece.color == Color.BLACK:
+			self.fullmove_number -= 1
+
+		self._invalidate_cache()
+
+		return record
+
 	def print_player_valid_moves(
 		self, player: Player
 	) -> list[tuple[Piece, Coordinate]]:
@@ -364,7 +959,7 @@ class ChessGame:
 		for player in (self.white_p, self.black_p):
 			print(self.board)
 
-			player.update_valid_moves()
+			self.update_valid_moves()
 
 			state = self.check_state()
 			if state != GameEndState.ONGOING: return True
@@ -379,8 +974,7 @@ def main():
 	game = ChessGame()
 
 	game.classic_setup()
-	game.white_p.update_valid_moves()
-	game.black_p.update_valid_moves()
+	game.update_valid_moves()
 
 	while True:
 		game_over = game.step()
@@ -1,8 +1,25 @@
 from __future__ import annotations
-from chess.components import Color, Board, Coordinate, Piece, PieceType
+import enum
+from chess.components import (
+	COORDINATES, Color, Board, Coordinate, Piece, PieceType
+)
+from chess.tables import (
+	BETWEEN, LINE, PAWN_PUSHES, PAWN_START_ROWS, bishop_attacks, rook_attacks
+)
 
 class DummyKing: ...
 
+
+class MoveGeneration(enum.Enum):
+	# play every available move on the board and look for checks
+	BRUTE_FORCE = enum.auto()
+	# find the checkers and pinned pieces once, then only generate legal moves
+	LEGAL = enum.auto()
+
+
+# every square of the board
+FULL_BOARD: int = (1 << 64) - 1
+
 CASTLE_PATHS: dict[str, tuple[str, str]] = {
 	'a': ('c', 'd'),
 	'h': ('g', 'f')
@@ -10,15 +27,25 @@ CASTLE_PATHS: dict[str, tuple[str, str]] = {
 
 
 class Player:
-	def __init__(self, board: Board, color: Color):
+	def __init__(
+		self,
+		board: Board,
+		color: Color,
+		move_generation: MoveGeneration = MoveGeneration.LEGAL
+	):
 		if not isinstance(color, Color):
 			raise TypeError(f'color should be of type {Color.__name__}!')
 		if not isinstance(board, Board):
 			raise TypeError(f'board should be of type {Board.__name__}!')
+		if not isinstance(move_generation, MoveGeneration):
+			raise TypeError(
+				f'move_generation should be of type {MoveGeneration.__name__}!'
+			)
 
 		self.board = board
 		self.color = color
 		self.pieces: list[Piece] = []
+		self.move_generation = move_generation
 
 	@property
 	def _start_rank(self) -> str:
@@ -74,26 +101,41 @@ class Player:
 		# enemy of my enemy is myself!
 		opponent.opponent = self
 
-	def update_valid_moves(self) -> None:
+	def update_valid_moves(
+		self, en_passant_target: Coordinate | None = None
+	) -> None:
 		"""
 		updates valid_moves property for each piece of the player
 		this is a subset of each piece's available_moves()
 		but considers potential checks and illegal moves in chess
-		and sets up only the legal and valid moves
+		and sets up only the legal and valid moves.
+		en_passant_target is the square behind a pawn that just moved
+		two squares, if the player can capture it en passant.
 		"""
+		if self.move_generation == MoveGeneration.BRUTE_FORCE:
+			self._brute_force_valid_moves(en_passant_target)
+		else:
+			self._legal_valid_moves(en_passant_target)
+
+		self.add_castle_moves_to_king()
+
+	def _brute_force_valid_moves(
+		self, en_passant_target: Coordinate | None
+	) -> None:
+		""" tries every available move on the board and tests for checks. """
 		for piece in self.pieces:
 			valid_moves: list[Coordinate] = []
 
 			# save to restore later
 			original_coord = piece.coordinate
 
-			for coord in piece.available_moves():
+			for coord in piece.available_moves(self.board):
 				enemy_piece: Piece | None = self.board.get(coord).piece
 
 				if enemy_piece:
 					self.board.remove(coord)
 					# and remove from opponent's pieces
-					self.opponent.remove_piece(enemy_piece)
+					enemy_index = self.opponent.remove_piece(enemy_piece)
 
 				self.board.move(piece, coord, examine_mode=True)
 
@@ -104,25 +146,221 @@ class Player:
 				self.board.move(piece, original_coord, examine_mode=True)
 				if enemy_piece:
 					self.board.put(enemy_piece, enemy_piece.coordinate)
-					self.opponent.add_piece(enemy_piece)
+					self.opponent.add_piece(enemy_piece, enemy_index)
 
 			# update valid moves for each piece
 			piece.valid_moves = valid_moves
 
-		self.add_castle_moves_to_king()
+		for pawn in self.en_passant_capturers(en_passant_target):
+			enemy_pawn: Piece = self.board.get(
+				self._en_passant_victim(en_passant_target)
+			).piece
+			original_coord = pawn.coordinate
+
+			self.board.remove(enemy_pawn.coordinate)
+			enemy_index = self.opponent.remove_piece(enemy_pawn)
+			self.board.move(pawn, en_passant_target, examine_mode=True)
+
+			if not self.is_in_check():
+				pawn.valid_moves.append(en_passant_target)
+
+			self.board.move(pawn, original_coord, examine_mode=True)
+			self.board.put(enemy_pawn, enemy_pawn.coordinate)
+			self.opponent.add_piece(enemy_pawn, enemy_index)
+
+	def _legal_valid_moves(self, en_passant_target: Coordinate | None) -> None:
+		"""
+		generates only legal moves, without trying them on the board.
+		a non-king move is legal if it stays on the line of its pin(if any)
+		and, when in check, captures the checker or blocks its ray.
+		the king may go wherever the opponent does not attack,
+		looking through the king itself for sliding attacks.
+		"""
+		board = self.board
+		own: int = board.occupancy[self.color.index]
+
+		if isinstance(self.king, DummyKing):
+			# nothing can be pinned or checked, every move is legal
+			for piece in self.pieces:
+				piece.valid_moves = self._moves_within(piece, FULL_BOARD, own)
+			for pawn in self.en_passant_capturers(en_passant_target):
+				pawn.valid_moves.append(en_passant_target)
+			return
+
+		k: int = self.king.coordinate.index
+		king_bit: int = 1 << k
+		opponent_color: Color = self.opponent.color
+		occupied: int = board.occupied
+
+		checkers: int = board.attackers_to(k, opponent_color)
+
+		# squares the king cannot step on. the sliders giving check
+		# also attack the squares behind the king on their rays
+		danger: int = board.attack_map(opponent_color)
+		bb = checkers
+		while bb:
+			lsb = bb & -bb
+			j = lsb.bit_length() - 1
+			danger |= board.piece_attacks(
+				board.squares[j].piece, j, occupied ^ king_bit
+			)
+			bb ^= lsb
+
+		self.king.valid_moves = self._moves_within(
+			self.king, FULL_BOARD & ~danger, own
+		)
+
+		# in double check only the king can move
+		if checkers & (checkers - 1):
+			for piece in self.pieces:
+				if piece is not self.king:
+					piece.valid_moves = []
+			return
 
-	def add_piece(self, piece: Piece) -> None:
-		"""	adds the given piece to self.pieces & updates self.king. """
+		# when in check, the other pieces have to capture or block the checker
+		target_mask: int = FULL_BOARD
+		if checkers:
+			checker: int = checkers.bit_length() - 1
+			target_mask = checkers | BETWEEN[k][checker]
+
+		pins: dict[int, int] = self._pins(k, occupied, own)
+
+		for piece in self.pieces:
+			if piece is self.king: continue
+
+			mask = target_mask & pins.get(piece.coordinate.index, FULL_BOARD)
+			piece.valid_moves = self._moves_within(piece, mask, own)
+
+		for pawn in self.en_passant_capturers(en_passant_target):
+			# play the capture on a copy of the occupancy and look for
+			# attacks on the king, this covers the pins through both pawns
+			victim: int = self._en_passant_victim(en_passant_target).index
+			occupied_after: int = (
+				occupied ^ (1 << pawn.coordinate.index) ^ (1 << victim)
+				| (1 << en_passant_target.index)
+			)
+			if not board.attackers_to(k, opponent_color, occupied_after):
+				pawn.valid_moves.append(en_passant_target)
+
+	def _pins(self, k: int, occupied: int, own: int) -> dict[int, int]:
+		"""
+		returns the pinned pieces of the player, as a dict that maps
+		the square index of each pinned piece to the line it can move on.
+		k is the square index of the king.
+		"""
+		board = self.board
+		opponent_color: Color = self.opponent.color
+		queens = board.bitboard(opponent_color, PieceType.QUEEN)
+
+		# opponent sliders that would attack the king on an empty board
+		snipers: int = (
+			rook_attacks(k, 0) &
+			(board.bitboard(opponent_color, PieceType.ROOK) | queens) |
+			bishop_attacks(k, 0) &
+			(board.bitboard(opponent_color, PieceType.BISHOP) | queens)
+		)
+
+		pins: dict[int, int] = {}
+		while snipers:
+			lsb = snipers & -snipers
+			s = lsb.bit_length() - 1
+			snipers ^= lsb
+
+			blockers = BETWEEN[k][s] & occupied
+			# pinned if the only piece in the middle is one of our own
+			if blockers and not blockers & (blockers - 1) and blockers & own:
+				pins[blockers.bit_length() - 1] = LINE[k][s]
+
+		return pins
+
+	def _moves_within(self, piece: Piece, mask: int, own: int) -> list[Coordinate]:
+		"""
+		returns the available moves of the piece that land inside mask.
+		pawns capture on the squares they attack and push to the empty
+		squares ahead, the other pieces move to the squares they attack.
+		"""
+		board = self.board
+		i = piece.coordinate.index
+
+		if piece.piece_type == PieceType.PAWN:
+			c = self.color.index
+			occupied = board.occupied
+			bb = board.attacks_from[i] & board.occupancy[1 - c]
+
+			step = PAWN_PUSHES[c]
+			push = i + step
+			if 0 <= push < 64 and not occupied >> push & 1:
+				bb |= 1 << push
+				if i // 8 == PAWN_START_ROWS[c] and not occupied >> (push + step) & 1:
+					bb |= 1 << (push + step)
+		else:
+			bb = board.attacks_from[i] & ~own
+
+		moves: list[Coordinate] = []
+		bb &= mask
+		while bb:
+			lsb = bb & -bb
+			moves.append(COORDINATES[lsb.bit_length() - 1])
+			bb ^= lsb
+
+		return moves
+
+	def en_passant_capturers(
+		self, en_passant_target: Coordinate | None
+	) -> list[Piece]:
+		""" returns the pawns that can capture on en_passant_target. """
+		if en_passant_target is None: return []
+
+		victim: Piece | None = self.board.get(
+			self._en_passant_victim(en_passant_target)
+		).piece
+		if not (victim and victim.color != self.color and
+			victim.piece_type == PieceType.PAWN): return []
+
+		# our pawns stand where an opponent pawn on the target would attack
+		pawns: int = self.board.bitboard(self.color, PieceType.PAWN)
+		pawns &= self.board.piece_attacks(victim, en_passant_target.index, 0)
+
+		capturers: list[Piece] = []
+		while pawns:
+			lsb = pawns & -pawns
+			capturers.append(self.board.squares[lsb.bit_length() - 1].piece)
+			pawns ^= lsb
+
+		return capturers
+
+	def _en_passant_victim(self, en_passant_target: Coordinate) -> Coordinate:
+		""" returns the coordinate of the pawn captured en passant. """
+		if self.color == Color.WHITE:
+			return COORDINATES[en_passant_target.index - 8]
+		return COORDINATES[en_passant_target.index + 8]
+
+	def add_piece(self, piece: Piece, index: int | None = None) -> None:
+		"""
+		adds the given piece to self.pieces, at the given index if any,
+		as returned by remove_piece, otherwise at the end.
+		"""
 		if not isinstance(piece, Piece):
 			raise TypeError(
 				f'piece should be of type {Piece.__name__}'
 			)
 
-		self.pieces.append(piece)
+		if index is None:
+			self.pieces.append(piece)
+		else:
+			self.pieces.insert(index, piece)
+
+	def remove_piece(self, piece: Piece) -> int | None:
+		""" removes the given piece from self.pieces and returns its index. """
+		if piece is None: return None
+
+		# compare by identity, two pieces can be equal but not the same
+		for i, p in enumerate(self.pieces):
+			if p is piece:
+				del self.pieces[i]
+				return i
 
-	def remove_piece(self, piece: Piece) -> None:
-		if piece is None: return
-		self.pieces.remove(piece)
+		raise ValueError(f'{piece!r} is not one of the pieces of {self}!')
 
 	def castle_moves(
 		self
@@ -148,9 +386,9 @@ class Player:
 		valid_rooks: list[Piece] = []
 		for rook in self.rooks():
 			if rook.has_moved: continue
-			rook_attacks: list[Coordinate] = rook.attacking_coordinates()
+			rook_attacks: int = self.board.attacks_from[rook.coordinate.index]
 			# there are pieces in the middle
-			if self.king.coordinate not in rook_attacks: continue
+			if not rook_attacks >> self.king.coordinate.index & 1: continue
 
 			valid_rooks.append(rook)
 
@@ -184,27 +422,22 @@ class Player:
 			_, king_new_coord, *_ = moves_pair
 			self.king.valid_moves.append(king_new_coord)
 
-	def potential_en_passant_pawns(self) -> list[Piece]:
-		potential_pawns: list[Piece]= []
-
-		for piece in self.pieces:
-			if piece.piece_type != PieceType.PAWN: continue
-
-			if self.color == Color.WHITE:
-				if piece.coordinate.rank == '5':
-					potential_pawns.append(piece)
-			else:
-				if piece.coordinate.rank == '4':
-					potential_pawns.append(piece)
-		return potential_pawns
-
 	def is_under_attack(self, coordinate: Coordinate) -> bool:
 		""" returns wether the given square is under opponent's attack."""
-		for op_piece in self.opponent.pieces:
-			if coordinate in op_piece.attacking_coordinates():
-				return True
+		attacks: int = self.board.attack_map(self.opponent.color)
+		return bool(attacks >> coordinate.index & 1)
+
+	def attackers(self, coordinate: Coordinate) -> list[Piece]:
+		""" returns the opponent's pieces that attack the given square. """
+		attackers: list[Piece] = []
+
+		bb: int = self.board.attackers_to(coordinate.index, self.opponent.color)
+		while bb:
+			lsb = bb & -bb
+			attackers.append(self.board.squares[lsb.bit_length() - 1].piece)
+			bb ^= lsb
 
-		return False
+		return attackers
 
 	def is_in_check(self) -> bool:
 		""" returns wether the player is in check or not. """
@@ -0,0 +1,187 @@
+import argparse
+import sys
+import time
+from chess.game.game import ChessGame, STARTING_FEN
+
+# (name, FEN, known perft counts for depth 1, 2, ...)
+PERFT_SUITE: list[tuple[str, str, list[int]]] = [
+	(
+		'initial position',
+		STARTING_FEN,
+		[20, 400, 8902, 197281],
+	),
+	(
+		'kiwipete',
+		'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+		[48, 2039, 97862],
+	),
+	(
+		'position 3',
+		'8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+		[14, 191, 2812, 43238],
+	),
+	(
+		'position 4',
+		'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+		[6, 264, 9467],
+	),
+	(
+		'position 5',
+		'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+		[44, 1486, 62379],
+	),
+	(
+		'illegal en passant 1',
+		'3k4/3p4/8/K1P4r/8/8/8/8 b - - 0 1',
+		[18, 92, 1670, 10138],
+	),
+	(
+		'illegal en passant 2',
+		'8/8/4k3/8/2p5/8/B2P2K1/8 w - - 0 1',
+		[13, 102, 1266, 10276],
+	),
+	(
+		'en passant capture checks opponent',
+		'8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1',
+		[15, 126, 1928, 13931],
+	),
+	(
+		'short castling gives check',
+		'5k2/8/8/8/8/8/8/4K2R w K - 0 1',
+		[15, 66, 1198, 6399],
+	),
+	(
+		'long castling gives check',
+		'3k4/8/8/8/8/8/8/R3K3 w Q - 0 1',
+		[16, 71, 1286, 7418],
+	),
+	(
+		'castling rights',
+		'r3k2r/1b4bq/8/8/8/8/7B/R3K2R w KQkq - 0 1',
+		[26, 1141, 27826],
+	),
+	(
+		'castling prevented',
+		'r3k2r/8/3Q4/8/8/5q2/8/R3K2R b KQkq - 0 1',
+		[44, 1494, 50509],
+	),
+	(
+		'promote out of check',
+		'2K2r2/4P3/8/8/8/8/8/3k4 w - - 0 1',
+		[11, 133, 1442, 19174],
+	),
+	(
+		'discovered check',
+		'8/8/1P2K3/8/2n5/1q6/8/5k2 b - - 0 1',
+		[29, 165, 5160, 31961],
+	),
+	(
+		'promote to give check',
+		'4k3/1P6/8/8/8/8/K7/8 w - - 0 1',
+		[9, 40, 472, 2661],
+	),
+	(
+		'under promote to give check',
+		'8/P1k5/K7/8/8/8/8/8 w - - 0 1',
+		[6, 27, 273, 1329],
+	),
+	(
+		'self stalemate',
+		'K1k5/8/P7/8/8/8/8/8 w - - 0 1',
+		[2, 6, 13, 63],
+	),
+	(
+		'stalemate and checkmate',
+		'8/k1P5/8/1K6/8/8/8/8 w - - 0 1',
+		[10, 25, 268, 926],
+	),
+	(
+		'stalemate and checkmate 2',
+		'8/8/2k5/5q2/5n2/8/5K2/8 b - - 0 1',
+		[37, 183, 6559, 23527],
+	),
+]
+
+
+def run_suite(max_depth: int, name_filter: str = '') -> bool:
+	"""
+	runs perft on every position of the suite up to max_depth
+	(or the deepest known count) and prints the node counts and speed.
+	returns wether all the counts matched.
+	"""
+	game = ChessGame()
+	all_passed = True
+	total_nodes = 0
+	total_time = 0.0
+
+	for name, fen, counts in PERFT_SUITE:
+		if name_filter not in name: continue
+
+		for depth, expected in enumerate(counts[:max_depth], 1):
+			game.load_FEN(fen)
+
+			start = time.perf_counter()
+			nodes = game.perft(depth)
+			elapsed = time.perf_counter() - start
+
+			total_nodes += nodes
+			total_time += elapsed
+
+			passed = nodes == expected
+			all_passed = all_passed and passed
+
+			nps = nodes / elapsed if elapsed else 0
+			status = 'ok' if passed else f'FAIL(expected {expected})'
+			print(
+				f'{name: <36} depth {depth}: {nodes: >9} nodes ' +
+				f'{elapsed: >8.3f}s {nps: >10.0f} nps  {status}'
+			)
+
+	if total_time:
+		print(
+			f'total: {total_nodes} nodes in {total_time:.3f}s, ' +
+			f'{total_nodes/total_time:.0f} nps'
+		)
+
+	return all_passed
+
+
+def divide(fen: str, depth: int) -> None:
+	""" prints the perft of each move, to compare with other engines. """
+	game = ChessGame()
+	game.load_FEN(fen)
+
+	result = game.divide(depth)
+	for move, nodes in sorted(result.items()):
+		print(f'{move}: {nodes}')
+	print(f'total: {sum(result.values())}')
+
+
+def main():
+	parser = argparse.ArgumentParser(
+		description='validate and benchmark the move generation with perft.'
+	)
+	parser.add_argument(
+		'-d', '--depth', type=int, default=3,
+		help='maximum depth to run for each position(default: 3)'
+	)
+	parser.add_argument(
+		'-p', '--position', default='',
+		help='only run the positions whose name contains this text'
+	)
+	parser.add_argument(
+		'--divide', metavar='FEN',
+		help='print the perft of each move of the given position instead'
+	)
+	args = parser.parse_args()
+
+	if args.divide:
+		divide(args.divide, args.depth)
+		return
+
+	if not run_suite(args.depth, args.position):
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
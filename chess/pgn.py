@@ -0,0 +1,326 @@
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import TextIO
+from chess.components import Coordinate, Piece, PieceType
+from chess.game.game import ChessGame, Move, STARTING_FEN, long_algebraic
+
+RESULTS: tuple[str, ...] = ('1-0', '0-1', '1/2-1/2', '*')
+
+# the tags every PGN game should have, in this order
+SEVEN_TAG_ROSTER: tuple[str, ...] = (
+	'Event', 'Site', 'Date', 'Round', 'White', 'Black', 'Result'
+)
+
+SAN_PATTERN = re.compile(
+	r'^([KQRBN])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([QRBNqrbn]))?$'
+)
+TAG_PATTERN = re.compile(r'^\[\s*(\w+)\s+"(.*)"\s*\]$')
+# move numbers like '12.' or '12...', possibly glued to the move
+MOVE_NUMBER_PATTERN = re.compile(r'^\d+\.+')
+
+# line length of the movetext written by format_game
+LINE_LENGTH: int = 80
+
+
+@dataclass(slots=True)
+class PGNGame:
+	"""
+	a game read from a PGN file. the moves are in long algebraic notation,
+	like ChessGame.moves_played(). if a move could not be played, error
+	says why and moves holds the moves before it. if the FEN tag could not
+	be loaded, error says why and moves is empty.
+	"""
+	headers: dict[str, str] = field(default_factory=dict)
+	moves: list[str] = field(default_factory=list)
+	result: str = '*'
+	error: str | None = None
+
+
+def san(game: ChessGame, move: Move) -> str:
+	"""
+	returns the standard algebraic notation of a legal move of the player
+	to move, like 'Nbd7', 'exd5', 'e8=Q+' or 'O-O#'.
+	"""
+	piece, coordinate, promotion = move
+	origin = piece.coordinate
+
+	if game.get_rook_castle_move(piece, coordinate):
+		text = 'O-O' if coordinate.col > origin.col else 'O-O-O'
+	else:
+		capture = (
+			game.board.squares[coordinate.index].piece is not None or
+			(piece.piece_type == PieceType.PAWN and coordinate.col != origin.col)
+		)
+
+		if piece.piece_type == PieceType.PAWN:
+			text = f'{origin.file}x' if capture else ''
+			text += f'{coordinate.file}{coordinate.rank}'
+			if promotion:
+				text += '=' + promotion.value.upper()
+		else:
+			text = piece.piece_type.value.upper()
+			text += _disambiguation(game, piece, coordinate)
+			if capture:
+				text += 'x'
+			text += f'{coordinate.file}{coordinate.rank}'
+
+	game.make_move(piece, coordinate, promotion)
+	if game.current_player.is_in_check():
+		text += '#' if not game.legal_moves() else '+'
+	game.unmake_move()
+
+	return text
+
+
+def _disambiguation(game: ChessGame, piece: Piece, coordinate: Coordinate) -> str:
+	"""
+	returns the file, rank or both of the piece's coordinate, as needed
+	to tell it apart from the other pieces of its type that can move there.
+	"""
+	others = [
+		p for p, c, _ in game.legal_moves()
+		if c == coordinate and p is not piece and p.piece_type == piece.piece_type
+	]
+	if not others: return ''
+
+	origin = piece.coordinate
+	if all(p.coordinate.file != origin.file for p in others):
+		return origin.file
+	if all(p.coordinate.rank != origin.rank for p in others):
+		return origin.rank
+	return f'{origin.file}{origin.rank}'
+
+
+def parse_san(game: ChessGame, text: str) -> Move:
+	"""
+	returns the legal move of the player to move given in standard
+	algebraic notation. check marks and annotations like '!?' are ignored.
+	raises ValueError if the move is not legal or is ambiguous.
+	"""
+	text = text.rstrip('+#!?')
+	moves = game.legal_moves()
+
+	if text in ('O-O', '0-0', 'O-O-O', '0-0-0'):
+		long_castle = len(text) == 5
+		for move in moves:
+			piece, coordinate, _ = move
+			if not game.get_rook_castle_move(piece, coordinate): continue
+			if (coordinate.col < piece.coordinate.col) == long_castle:
+				return move
+		raise ValueError(f'castling {text!r} is not legal')
+
+	match = SAN_PATTERN.match(text)
+	if not match:
+		raise ValueError(f'{text!r} is not a move in algebraic notation')
+
+	letter, from_file, from_rank, target, promotion_letter = match.groups()
+	piece_type = PieceType(letter.lower()) if letter else PieceType.PAWN
+	promotion = PieceType(promotion_letter.lower()) if promotion_letter else None
+
+	candidates: list[Move] = []
+	for move in moves:
+		piece, coordinate, move_promotion = move
+		if piece.piece_type != piece_type: continue
+		if f'{coordinate.file}{coordinate.rank}' != target: continue
+		if from_file and piece.coordinate.file != from_file: continue
+		if from_rank and piece.coordinate.rank != from_rank: continue
+		# a missing promotion piece means a queen
+		if move_promotion and move_promotion != (promotion or PieceType.QUEEN): continue
+		candidates.append(move)
+
+	if not candidates:
+		raise ValueError(f'{text!r} is not legal')
+	if len(candidates) > 1:
+		raise ValueError(f'{text!r} is ambiguous')
+	return candidates[0]
+
+
+def _movetext_tokens(line: str, state: list[int]) -> Iterator[str]:
+	"""
+	yields the moves and results of a line of movetext, dropping move
+	numbers, NAGs, comments and variations. state is [comment, variation
+	depth], carried between the lines since comments can span them.
+	"""
+	for token in re.findall(r'\{|\}|\(|\)|;|[^\s{}();]+', line):
+		if state[0]:
+			if token == '}':
+				state[0] = 0
+			continue
+		if token == '{':
+			state[0] = 1
+		elif token == ';':
+			# comment to the end of the line
+			return
+		elif token == '(':
+			state[1] += 1
+		elif token == ')':
+			state[1] = max(0, state[1] - 1)
+		elif not state[1] and not token.startswith('$'):
+			token = MOVE_NUMBER_PATTERN.sub('', token)
+			if token:
+				yield token
+
+
+def read_games(file: TextIO, game: ChessGame | None = None) -> Iterator[PGNGame]:
+	"""
+	reads the games of a PGN file one at a time, so that the memory used
+	does not grow with the file. each game is played on the given game
+	object, or on one made for the whole file, which holds the position
+	of the last game yielded until the next one is read.
+	"""
+	if game is None:
+		game = ChessGame()
+
+	pgn_game: PGNGame | None = None
+	# in_moves is set once the movetext of the current game started
+	in_moves = False
+	state = [0, 0]
+
+	def start(pgn: PGNGame) -> None:
+		""" sets up the position of the game, a bad FEN skips its moves. """
+		try:
+			game.load_FEN(pgn.headers.get('FEN', STARTING_FEN))
+		except Exception as e:
+			pgn.error = f'invalid FEN: {e}'
+
+	for line in file:
+		line = line.strip()
+		# lines starting with % are escaped, for other programs
+		if line.startswith('%'): continue
+
+		if not state[0] and line.startswith('['):
+			tag = TAG_PATTERN.match(line)
+			if not tag: continue
+			# a tag after moves starts a new game, even without a result
+			if pgn_game is not None and in_moves:
+				yield pgn_game
+				pgn_game = None
+			if pgn_game is None:
+				pgn_game = PGNGame()
+				in_moves = False
+			pgn_game.headers[tag.group(1)] = tag.group(2)
+			continue
+
+		if not line and not state[0]: continue
+
+		for token in _movetext_tokens(line, state):
+			if pgn_game is None:
+				pgn_game = PGNGame()
+			if not in_moves:
+				in_moves = True
+				start(pgn_game)
+
+			if token in RESULTS:
+				pgn_game.result = token
+				yield pgn_game
+				pgn_game = None
+				in_moves = False
+				state[:] = [0, 0]
+				break
+
+			if pgn_game.error: continue
+			try:
+				piece, coordinate, promotion = parse_san(game, token)
+			except ValueError as e:
+				pgn_game.error = f'move {len(pgn_game.moves)//2 + 1}: {e}'
+				continue
+			pgn_game.moves.append(long_algebraic(piece.coordinate, coordinate, promotion))
+			game.move(piece, coordinate, promotion)
+
+	if pgn_game is not None:
+		if not in_moves:
+			start(pgn_game)
+		yield pgn_game
+
+
+def san_moves(game: ChessGame) -> list[str]:
+	"""
+	returns the moves of game.history in standard algebraic notation.
+	the game is taken back to its initial position and played again
+	from the moves in long algebraic notation, it ends in the same
+	position. the records are not replayed, a promotion makes a new
+	piece and the later records would still refer to the old one.
+	"""
+	played = game.moves_played()
+	while game.history:
+		game.unmake_move()
+
+	moves: list[str] = []
+	for text in played:
+		move = game.parse_move(text)
+		moves.append(san(game, move))
+		game.make_move(*move)
+
+	return moves
+
+
+def game_result(game: ChessGame) -> str:
+	""" returns the PGN result of the position: '1-0', '0-1', '1/2-1/2' or '*'. """
+	if game.legal_moves(): return '*'
+	if not game.current_player.is_in_check(): return '1/2-1/2'
+	return '0-1' if game.current_player is game.white_p else '1-0'
+
+
+def format_game(headers: dict[str, str], moves: list[str], result: str) -> str:
+	"""
+	returns a game in PGN: the seven tag roster first, then the other
+	headers, then the moves in SAN with move numbers, wrapped to LINE_LENGTH.
+	"""
+	headers = {**headers, 'Result': result}
+	lines = [
+		f'[{tag} "{headers.get(tag, "?")}"]' for tag in SEVEN_TAG_ROSTER
+	]
+	lines += [
+		f'[{tag} "{value}"]' for tag, value in headers.items()
+		if tag not in SEVEN_TAG_ROSTER
+	]
+	lines.append('')
+
+	# black moves first in games set up from such a FEN
+	fen_fields = headers.get('FEN', STARTING_FEN).split()
+	black_first = fen_fields[1] == 'b'
+	move_number = int(fen_fields[5]) if len(fen_fields) > 5 else 1
+
+	tokens: list[str] = []
+	for i, move in enumerate(moves):
+		white = (i % 2 == 0) != black_first
+		if white:
+			tokens.append(f'{move_number}.')
+		elif i == 0:
+			tokens.append(f'{move_number}...')
+		tokens.append(move)
+		if not white:
+			move_number += 1
+	tokens.append(result)
+
+	line = ''
+	for token in tokens:
+		if line and len(line) + 1 + len(token) > LINE_LENGTH:
+			lines.append(line)
+			line = token
+		else:
+			line = f'{line} {token}' if line else token
+	lines.append(line)
+
+	return '\n'.join(lines) + '\n'
+
+
+def write_game(
+	file: TextIO,
+	game: ChessGame,
+	headers: dict[str, str] | None = None,
+	result: str | None = None
+) -> None:
+	"""
+	writes the moves played in the game as a PGN game, followed by an
+	empty line so that games can be appended one after another.
+	the result is read from the position if not given.
+	"""
+	headers = dict(headers or {})
+	if game.initial_FEN and game.initial_FEN != STARTING_FEN:
+		headers['SetUp'] = '1'
+		headers['FEN'] = game.initial_FEN
+
+	file.write(format_game(headers, san_moves(game), result or game_result(game)))
+	file.write('\n')
@@ -1,6 +1,8 @@
-from chess.components import Coordinate, Color, Piece, PieceType
+from chess.components import Board, Coordinate, Color, Piece, PieceType
 
 class Bishop(Piece):
+	__slots__ = ()
+
 	from chess.game.player import Player
 	def __init__(self, player: Player, coordinate: Coordinate):
 		super().__init__(player, coordinate)
@@ -9,7 +11,7 @@ class Bishop(Piece):
 	def piece_type(self) -> PieceType:
 		return PieceType.BISHOP
 
-	def attacking_coordinates(self) -> list[Coordinate]:
+	def attacking_coordinates(self, board: Board) -> list[Coordinate]:
 		"""
 		returns all coordinates that are under the attack of the bishop.
 		"""
@@ -25,18 +27,18 @@ class Bishop(Piece):
 
 		for direction in attacking_directions:
 			moves.extend(
-				self.board.get_coordinates(self.coordinate, direction)
+				board.get_coordinates(self.coordinate, direction)
 			)
 
 		return moves
 
-	def available_moves(self) -> list[Coordinate]:
+	def available_moves(self, board: Board) -> list[Coordinate]:
 		"""
 		returns the moves that the bishop can choose.
 		regardless of checks.
 		"""
 
-		return super().available_moves()
+		return super().available_moves(board)
 
 	def __repr__(self):
 		return 'B' if self.color == Color.WHITE else 'b'
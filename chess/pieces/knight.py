@@ -1,6 +1,14 @@
-from chess.components import Coordinate, Color, Piece, PieceType
+from chess.components import Board, COORDINATES, Coordinate, Color, Piece, PieceType
+from chess.tables import KNIGHT_TARGETS
+
+# the coordinates attacked from each square, indexed by Coordinate.index
+_ATTACKS: tuple[tuple[Coordinate, ...], ...] = tuple(
+	tuple(COORDINATES[i] for i in targets) for targets in KNIGHT_TARGETS
+)
 
 class Knight(Piece):
+	__slots__ = ()
+
 	from chess.game.player import Player
 	def __init__(self, player: Player, coordinate: Coordinate):
 		super().__init__(player, coordinate)
@@ -9,34 +17,20 @@ class Knight(Piece):
 	def piece_type(self) -> PieceType:
 		return PieceType.KNIGHT
 
-	def attacking_coordinates(self) -> list[Coordinate]:
+	def attacking_coordinates(self, board: Board) -> list[Coordinate]:
 		"""
 		returns the coordinates that the knight can attack
 		regardless of checks
 		"""
-		moves: list[Coordinate] = []
-
-		file_ord: int = ord(self.coordinate.file)
-		rank_ord: int = ord(self.coordinate.rank)
-
-		for f_dir, r_dir in [(2, 1), (1, 2)]:
-			for f_s, r_s in [(-1, 1), (1, -1), (1, 1), (-1, -1)]:
-				file = chr(file_ord + f_dir*f_s)
-				rank = chr(rank_ord + r_dir*r_s)
-				m = f'{file}{rank}'
-				if not Coordinate.is_valid(m): continue
-				moves.append(Coordinate(m))
-
-
-		return moves
+		return list(_ATTACKS[self.coordinate.index])
 
-	def available_moves(self) -> list[Coordinate]:
+	def available_moves(self, board: Board) -> list[Coordinate]:
 		"""
 		returns the moves that the knight can choose
 		regardless of checks.
 		"""
 
-		return super().available_moves()
+		return super().available_moves(board)
 
 	def __repr__(self):
 		return 'N' if self.color == Color.WHITE else 'n'
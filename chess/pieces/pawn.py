@@ -1,6 +1,16 @@
-from chess.components import Coordinate, Color, Piece, PieceType
+from chess.components import Board, COORDINATES, Coordinate, Color, Piece, PieceType
+from chess.tables import PAWN_PUSHES, PAWN_START_ROWS, PAWN_TARGETS
+
+# the coordinates attacked from each square, indexed by Color.index
+# and then by Coordinate.index
+_ATTACKS: tuple[tuple[tuple[Coordinate, ...], ...], ...] = tuple(
+	tuple(tuple(COORDINATES[i] for i in targets) for targets in color_targets)
+	for color_targets in PAWN_TARGETS
+)
 
 class Pawn(Piece):
+	__slots__ = ()
+
 	from chess.game.player import Player
 	def __init__(self, player: Player, coordinate: Coordinate):
 		super().__init__(player, coordinate)
@@ -9,72 +19,34 @@ class Pawn(Piece):
 	def piece_type(self) -> PieceType:
 		return PieceType.PAWN
 
-	def attacking_coordinates(self) -> list[Coordinate]:
+	def attacking_coordinates(self, board: Board) -> list[Coordinate]:
 		""" returns the one/two attacking coordinates of the pawn. """
-		moves: list[Coordinate] = []
-
-		if self.color == Color.WHITE:
-			new_rank = chr(ord(self.coordinate.rank)+1)
-		elif self.color == Color.BLACK:
-			new_rank = chr(ord(self.coordinate.rank)-1)
-
-		file = self.coordinate.file
-		possible_moves = [
-			chr(ord(file)-1)+new_rank,
-			chr(ord(file)+1)+new_rank,
-		]
-
-		for m in possible_moves:
-			if Coordinate.is_valid(m):
-				moves.append(Coordinate(m))
+		return list(_ATTACKS[self.color.index][self.coordinate.index])
 
-		return moves
-
-	def available_moves(self) -> list[Coordinate]:
+	def available_moves(self, board: Board) -> list[Coordinate]:
 		"""
 		returns all available moves for the pawn.
 		regardless of checks.
 		"""
 		moves: list[Coordinate] = []
+		c = self.color.index
+		occupied = board.occupied
 
-		file = self.coordinate.file
-		rank_ord = ord(self.coordinate.rank)
-
-		direction: int
-		starting_rank: str
-		if self.color == Color.WHITE:
-			direction = +1
-			starting_rank = '2'
-		elif self.color == Color.BLACK:
-			direction = -1
-			starting_rank = '7'
-
-		new_rank = chr(rank_ord + direction)
-		m = f'{file}{new_rank}'
-		if Coordinate.is_valid(m):
-			c: Coordinate = Coordinate(m)
-
-			# if there isn't a piece ahead(any color) -> can move forward
-			if not self.board.get(c).piece:
-				moves.append(c)
-
-				# only if it's the first move, allow double forward move
-				if self.coordinate.rank == starting_rank:
-					new_rank = chr(rank_ord + direction*2)
-					m = f'{file}{new_rank}'
-					if Coordinate.is_valid(m):
-						c = Coordinate(m)
+		# forward if there isn't a piece ahead(any color), and from the
+		# starting rank two squares if there isn't a piece in the way either
+		step = PAWN_PUSHES[c]
+		push = self.coordinate.index + step
+		if 0 <= push < 64 and not occupied >> push & 1:
+			moves.append(COORDINATES[push])
 
-						# if there isn't a piece ahead
-						if not self.board.get(c).piece:
-							moves.append(c)
+			if self.coordinate.row == PAWN_START_ROWS[c] and not occupied >> (push + step) & 1:
+				moves.append(COORDINATES[push + step])
 
 		# capturing moves
-		for move in self.attacking_coordinates():
-			p = self.board.get(move).piece
-			if p:
-				if p.color != self.color:
-					moves.append(move)
+		enemies = board.occupancy[1 - c]
+		for move in _ATTACKS[c][self.coordinate.index]:
+			if enemies >> move.index & 1:
+				moves.append(move)
 
 		return moves
 
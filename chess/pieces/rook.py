@@ -1,6 +1,8 @@
-from chess.components import Coordinate, Color, Piece, PieceType
+from chess.components import Board, Coordinate, Color, Piece, PieceType
 
 class Rook(Piece):
+	__slots__ = ()
+
 	from chess.game.player import Player
 
 	def __init__(self, player: Player, coordinate: Coordinate):
@@ -10,7 +12,7 @@ class Rook(Piece):
 	def piece_type(self) -> PieceType:
 		return PieceType.ROOK
 
-	def attacking_coordinates(self) -> list[Coordinate]:
+	def attacking_coordinates(self, board: Board) -> list[Coordinate]:
 		"""
 		returns all coordinates that are under the attack of the rook.
 		"""
@@ -26,18 +28,18 @@ class Rook(Piece):
 
 		for direction in attacking_directions:
 			moves.extend(
-				self.board.get_coordinates(self.coordinate, direction)
+				board.get_coordinates(self.coordinate, direction)
 			)
 
 		return moves
 
-	def available_moves(self) -> list[Coordinate]:
+	def available_moves(self, board: Board) -> list[Coordinate]:
 		"""
 		returns the moves that the rook can choose.
 		regardless of checks.
 		"""
 
-		return super().available_moves()
+		return super().available_moves(board)
 
 	def __repr__(self):
 		return 'R' if self.color == Color.WHITE else 'r'
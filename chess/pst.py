@@ -0,0 +1,126 @@
+# material and piece-square tables of the evaluation, in centipawns.
+# kept up to date by the board as pieces are put and removed, see
+# Board.mg_score, Board.eg_score and Board.phase. like chess.tables
+# they only hold plain ints, indexed like Board.bitboards: white's
+# king, queen, rook, bishop, knight and pawn first, then black's.
+
+# piece values, in the order of PieceType
+MG_VALUES: tuple[int, ...] = (0, 900, 500, 330, 320, 100)
+EG_VALUES: tuple[int, ...] = (0, 930, 520, 320, 290, 120)
+
+# how much each piece counts towards the midgame, the game phase is
+# the sum over the pieces on the board, TOTAL_PHASE at the start
+PHASE_WEIGHTS: tuple[int, ...] = (0, 4, 2, 1, 1, 0)
+TOTAL_PHASE: int = 24
+
+# the tables below are written as seen from white's side of the board,
+# the first row is rank 8 and the last row rank 1
+_KING_MG: tuple[int, ...] = (
+	-30, -40, -40, -50, -50, -40, -40, -30,
+	-30, -40, -40, -50, -50, -40, -40, -30,
+	-30, -40, -40, -50, -50, -40, -40, -30,
+	-30, -40, -40, -50, -50, -40, -40, -30,
+	-20, -30, -30, -40, -40, -30, -30, -20,
+	-10, -20, -20, -20, -20, -20, -20, -10,
+	 20,  20,   0,   0,   0,   0,  20,  20,
+	 20,  30,  10,   0,   0,  10,  30,  20,
+)
+# the king comes to the center once the queens are off
+_KING_EG: tuple[int, ...] = (
+	-50, -40, -30, -20, -20, -30, -40, -50,
+	-30, -20, -10,   0,   0, -10, -20, -30,
+	-30, -10,  20,  30,  30,  20, -10, -30,
+	-30, -10,  30,  40,  40,  30, -10, -30,
+	-30, -10,  30,  40,  40,  30, -10, -30,
+	-30, -10,  20,  30,  30,  20, -10, -30,
+	-30, -30,   0,   0,   0,   0, -30, -30,
+	-50, -30, -30, -30, -30, -30, -30, -50,
+)
+_QUEEN: tuple[int, ...] = (
+	-20, -10, -10,  -5,  -5, -10, -10, -20,
+	-10,   0,   0,   0,   0,   0,   0, -10,
+	-10,   0,   5,   5,   5,   5,   0, -10,
+	 -5,   0,   5,   5,   5,   5,   0,  -5,
+	  0,   0,   5,   5,   5,   5,   0,  -5,
+	-10,   5,   5,   5,   5,   5,   0, -10,
+	-10,   0,   5,   0,   0,   0,   0, -10,
+	-20, -10, -10,  -5,  -5, -10, -10, -20,
+)
+_ROOK: tuple[int, ...] = (
+	  0,   0,   0,   0,   0,   0,   0,   0,
+	  5,  10,  10,  10,  10,  10,  10,   5,
+	 -5,   0,   0,   0,   0,   0,   0,  -5,
+	 -5,   0,   0,   0,   0,   0,   0,  -5,
+	 -5,   0,   0,   0,   0,   0,   0,  -5,
+	 -5,   0,   0,   0,   0,   0,   0,  -5,
+	 -5,   0,   0,   0,   0,   0,   0,  -5,
+	  0,   0,   0,   5,   5,   0,   0,   0,
+)
+_BISHOP: tuple[int, ...] = (
+	-20, -10, -10, -10, -10, -10, -10, -20,
+	-10,   0,   0,   0,   0,   0,   0, -10,
+	-10,   0,   5,  10,  10,   5,   0, -10,
+	-10,   5,   5,  10,  10,   5,   5, -10,
+	-10,   0,  10,  10,  10,  10,   0, -10,
+	-10,  10,  10,  10,  10,  10,  10, -10,
+	-10,   5,   0,   0,   0,   0,   5, -10,
+	-20, -10, -10, -10, -10, -10, -10, -20,
+)
+_KNIGHT: tuple[int, ...] = (
+	-50, -40, -30, -30, -30, -30, -40, -50,
+	-40, -20,   0,   0,   0,   0, -20, -40,
+	-30,   0,  10,  15,  15,  10,   0, -30,
+	-30,   5,  15,  20,  20,  15,   5, -30,
+	-30,   0,  15,  20,  20,  15,   0, -30,
+	-30,   5,  10,  15,  15,  10,   5, -30,
+	-40, -20,   0,   5,   5,   0, -20, -40,
+	-50, -40, -30, -30, -30, -30, -40, -50,
+)
+_PAWN_MG: tuple[int, ...] = (
+	  0,   0,   0,   0,   0,   0,   0,   0,
+	 50,  50,  50,  50,  50,  50,  50,  50,
+	 10,  10,  20,  30,  30,  20,  10,  10,
+	  5,   5,  10,  25,  25,  10,   5,   5,
+	  0,   0,   0,  20,  20,   0,   0,   0,
+	  5,  -5, -10,   0,   0, -10,  -5,   5,
+	  5,  10,  10, -20, -20,  10,  10,   5,
+	  0,   0,   0,   0,   0,   0,   0,   0,
+)
+# in the endgame every step forward counts, on any file
+_PAWN_EG: tuple[int, ...] = (
+	  0,   0,   0,   0,   0,   0,   0,   0,
+	 80,  80,  80,  80,  80,  80,  80,  80,
+	 50,  50,  50,  50,  50,  50,  50,  50,
+	 30,  30,  30,  30,  30,  30,  30,  30,
+	 15,  15,  15,  15,  15,  15,  15,  15,
+	  5,   5,   5,   5,   5,   5,   5,   5,
+	  0,   0,   0,   0,   0,   0,   0,   0,
+	  0,   0,   0,   0,   0,   0,   0,   0,
+)
+
+
+def _tables(
+	tables: tuple[tuple[int, ...], ...],
+	values: tuple[int, ...]
+) -> tuple[tuple[int, ...], ...]:
+	"""
+	returns the 12 tables indexed by square index, with the piece values
+	added. black's are mirrored vertically and negated, so that the sum
+	over all the pieces is the score from white's point of view.
+	"""
+	white = tuple(
+		tuple(value + table[(7 - i // 8)*8 + i % 8] for i in range(64))
+		for table, value in zip(tables, values)
+	)
+	black = tuple(tuple(-t[(7 - i // 8)*8 + i % 8] for i in range(64)) for t in white)
+	return white + black
+
+
+PST_MG: tuple[tuple[int, ...], ...] = _tables(
+	(_KING_MG, _QUEEN, _ROOK, _BISHOP, _KNIGHT, _PAWN_MG), MG_VALUES
+)
+PST_EG: tuple[tuple[int, ...], ...] = _tables(
+	(_KING_EG, _QUEEN, _ROOK, _BISHOP, _KNIGHT, _PAWN_EG), EG_VALUES
+)
+# PHASE_WEIGHTS by piece index
+PHASE: tuple[int, ...] = PHASE_WEIGHTS * 2
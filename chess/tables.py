@@ -0,0 +1,188 @@
+# precomputed attack tables, built once on import.
+# every table is indexed by the square index(0-63) of Coordinate.index,
+# a1 is 0, h1 is 7 and h8 is 63. they only hold plain ints so that
+# both the board and the pieces can use them without circular imports.
+
+# offsets are (file_direction, rank_direction) like Board.get_coordinates
+KNIGHT_OFFSETS: tuple[tuple[int, int], ...] = (
+	(1, 2), (2, 1), (2, -1), (1, -2),
+	(-1, -2), (-2, -1), (-2, 1), (-1, 2),
+)
+KING_OFFSETS: tuple[tuple[int, int], ...] = (
+	(0, 1), (1, 1), (1, 0), (1, -1),
+	(0, -1), (-1, -1), (-1, 0), (-1, 1),
+)
+# the directions of the sliding pieces, same order as KING_OFFSETS
+RAY_DIRECTIONS: tuple[tuple[int, int], ...] = KING_OFFSETS
+
+
+def _targets(index: int, offsets: tuple[tuple[int, int], ...]) -> tuple[int, ...]:
+	"""
+	returns the square indices reached from index by each of the given
+	(file_offset, rank_offset) pairs, skipping the ones off the board.
+	"""
+	row, col = divmod(index, 8)
+
+	targets: list[int] = []
+	for d_col, d_row in offsets:
+		r, c = row + d_row, col + d_col
+		if 0 <= r < 8 and 0 <= c < 8:
+			targets.append(r*8 + c)
+
+	return tuple(targets)
+
+
+def to_mask(indices: tuple[int, ...]) -> int:
+	""" returns the bitboard with the bits of the given indices set. """
+	mask = 0
+	for i in indices:
+		mask |= 1 << i
+	return mask
+
+
+KNIGHT_TARGETS: tuple[tuple[int, ...], ...] = tuple(
+	_targets(i, KNIGHT_OFFSETS) for i in range(64)
+)
+KING_TARGETS: tuple[tuple[int, ...], ...] = tuple(
+	_targets(i, KING_OFFSETS) for i in range(64)
+)
+# indexed by Color.index first, white pawns attack up and black pawns down
+PAWN_TARGETS: tuple[tuple[tuple[int, ...], ...], ...] = (
+	tuple(_targets(i, ((-1, 1), (1, 1))) for i in range(64)),
+	tuple(_targets(i, ((-1, -1), (1, -1))) for i in range(64)),
+)
+# the row pawns start on and the index step of a push, by Color.index
+PAWN_START_ROWS: tuple[int, int] = (1, 6)
+PAWN_PUSHES: tuple[int, int] = (8, -8)
+
+KNIGHT_MASKS: tuple[int, ...] = tuple(map(to_mask, KNIGHT_TARGETS))
+KING_MASKS: tuple[int, ...] = tuple(map(to_mask, KING_TARGETS))
+PAWN_MASKS: tuple[tuple[int, ...], ...] = tuple(
+	tuple(map(to_mask, targets)) for targets in PAWN_TARGETS
+)
+
+
+def _ray(index: int, direction: tuple[int, int]) -> tuple[int, ...]:
+	""" returns the square indices from index to the edge of the board. """
+	d_col, d_row = direction
+	row, col = divmod(index, 8)
+
+	ray: list[int] = []
+	while 0 <= (row := row + d_row) < 8 and 0 <= (col := col + d_col) < 8:
+		ray.append(row*8 + col)
+
+	return tuple(ray)
+
+
+# RAYS[d][i] holds the squares from i towards RAY_DIRECTIONS[d], nearest first
+RAYS: tuple[tuple[tuple[int, ...], ...], ...] = tuple(
+	tuple(_ray(i, direction) for i in range(64)) for direction in RAY_DIRECTIONS
+)
+RAY_MASKS: tuple[tuple[int, ...], ...] = tuple(
+	tuple(map(to_mask, rays)) for rays in RAYS
+)
+# how much the square index changes with each step along a direction
+RAY_STEPS: tuple[int, ...] = tuple(
+	d_row*8 + d_col for d_col, d_row in RAY_DIRECTIONS
+)
+
+ROOK_DIRECTIONS: tuple[int, ...] = tuple(
+	d for d, (f, r) in enumerate(RAY_DIRECTIONS) if f == 0 or r == 0
+)
+BISHOP_DIRECTIONS: tuple[int, ...] = tuple(
+	d for d, (f, r) in enumerate(RAY_DIRECTIONS) if f != 0 and r != 0
+)
+
+
+def first_blocker(direction: int, blockers: int) -> int:
+	"""
+	returns the index of the blocker nearest to the origin of a ray.
+	blockers is the (non-empty) intersection of the ray and the occupancy.
+	rays with a positive step meet the lowest set bit first.
+	"""
+	if RAY_STEPS[direction] > 0:
+		return (blockers & -blockers).bit_length() - 1
+	return blockers.bit_length() - 1
+
+
+def ray_attacks(direction: int, index: int, occupied: int) -> int:
+	"""
+	returns the bitboard of the squares attacked from index along
+	the given direction, up to and including the first blocker.
+	"""
+	mask = RAY_MASKS[direction][index]
+	blockers = mask & occupied
+	if not blockers: return mask
+
+	# everything behind the blocker is hidden
+	return mask ^ RAY_MASKS[direction][first_blocker(direction, blockers)]
+
+
+def rook_attacks(index: int, occupied: int) -> int:
+	attacks = 0
+	for d in ROOK_DIRECTIONS:
+		attacks |= ray_attacks(d, index, occupied)
+	return attacks
+
+
+def bishop_attacks(index: int, occupied: int) -> int:
+	attacks = 0
+	for d in BISHOP_DIRECTIONS:
+		attacks |= ray_attacks(d, index, occupied)
+	return attacks
+
+
+def _between_and_line() -> tuple[list[list[int]], list[list[int]]]:
+	"""
+	builds the BETWEEN and LINE tables. for two squares on the same
+	rank, file or diagonal, BETWEEN[a][b] has the squares strictly between
+	them and LINE[a][b] the whole line through both of them.
+	both are 0 for squares that are not aligned.
+	"""
+	between = [[0] * 64 for _ in range(64)]
+	line = [[0] * 64 for _ in range(64)]
+
+	for a in range(64):
+		for d, rays in enumerate(RAYS):
+			# the direction opposite to d, RAY_DIRECTIONS is symmetric
+			opposite = (d + 4) % len(RAY_DIRECTIONS)
+			full_line = RAY_MASKS[d][a] | RAY_MASKS[opposite][a] | (1 << a)
+
+			ray = rays[a]
+			for k, b in enumerate(ray):
+				between[a][b] = to_mask(ray[:k])
+				line[a][b] = full_line
+
+	return between, line
+
+
+BETWEEN, LINE = _between_and_line()
+
+
+# the light and dark squares, a1 is dark
+LIGHT_SQUARES: int = to_mask(tuple(i for i in range(64) if (i // 8 + i % 8) % 2 == 1))
+DARK_SQUARES: int = ~LIGHT_SQUARES & ((1 << 64) - 1)
+
+# the squares of each file, indexed by column
+FILE_MASKS: tuple[int, ...] = tuple(
+	to_mask(tuple(row*8 + col for row in range(8))) for col in range(8)
+)
+# the squares of the files next to each file
+ADJACENT_FILE_MASKS: tuple[int, ...] = tuple(
+	(FILE_MASKS[col - 1] if col > 0 else 0) | (FILE_MASKS[col + 1] if col < 7 else 0)
+	for col in range(8)
+)
+# indexed by Color.index and then by square index: the squares in front of
+# a pawn on its file and the files next to it, where enemy pawns would
+# stop it or capture it on the way. a pawn with none of them there is passed
+PASSED_PAWN_MASKS: tuple[tuple[int, ...], ...] = tuple(
+	tuple(
+		to_mask(tuple(
+			r*8 + c
+			for r in (range(i // 8 + 1, 8) if color == 0 else range(i // 8))
+			for c in range(max(0, i % 8 - 1), min(8, i % 8 + 2))
+		))
+		for i in range(64)
+	)
+	for color in range(2)
+)
@@ -0,0 +1,261 @@
+import sys
+import threading
+import time
+from typing import TextIO
+from chess.engine import Engine, MATE_BOUND, MATE_SCORE, MAX_PLY
+from chess.game.game import ChessGame, Move, STARTING_FEN, long_algebraic
+
+ENGINE_NAME: str = 'Chess'
+ENGINE_AUTHOR: str = 'Alireza2317'
+
+# (name, default, min, max) of the spin options
+HASH_OPTION: tuple[str, int, int, int] = ('Hash', 16, 1, 1024)
+THREADS_OPTION: tuple[str, int, int, int] = ('Threads', 1, 1, 64)
+
+# without movestogo, the remaining time is spent as if this many moves were left
+MOVES_TO_GO: int = 30
+# kept back from every move for the time the GUI and the pipes take
+MOVE_OVERHEAD_MS: int = 50
+
+
+class UCI:
+	"""
+	the universal chess interface: reads commands from a GUI or tournament
+	manager, one per line, and writes the replies. the search runs on its
+	own thread, so that stop, isready and quit are answered while it runs.
+	"""
+	def __init__(self, output: TextIO = sys.stdout):
+		self.output: TextIO = output
+		self.game: ChessGame = ChessGame()
+		self.game.load_FEN(STARTING_FEN)
+		self.hash_mb: int = HASH_OPTION[1]
+		self.threads: int = THREADS_OPTION[1]
+		self.engine: Engine = Engine(self.hash_mb)
+
+		self._search_thread: threading.Thread | None = None
+		# an infinite search only ends with stop
+		self._infinite: bool = False
+		# set by stop, a new one for every search. it is made before the
+		# search thread starts, so that a stop right after go is not lost.
+		# an infinite search waits for it to give its move
+		self._stop_event = threading.Event()
+		# lines are written by both threads
+		self._output_lock = threading.Lock()
+
+	def send(self, line: str) -> None:
+		with self._output_lock:
+			self.output.write(line + '\n')
+			self.output.flush()
+
+	def loop(self, input: TextIO = sys.stdin) -> None:
+		""" handles the commands until quit or the end of the input. """
+		for line in input:
+			if not self.handle(line):
+				break
+		self.quit()
+
+	def handle(self, line: str) -> bool:
+		""" handles one command, returns False on quit. """
+		tokens = line.split()
+		if not tokens: return True
+		command, args = tokens[0], tokens[1:]
+
+		if command == 'uci':
+			self.send(f'id name {ENGINE_NAME}')
+			self.send(f'id author {ENGINE_AUTHOR}')
+			for name, default, low, high in (HASH_OPTION, THREADS_OPTION):
+				self.send(
+					f'option name {name} type spin default {default} min {low} max {high}'
+				)
+			self.send('uciok')
+		elif command == 'isready':
+			self.send('readyok')
+		elif command == 'ucinewgame':
+			self.wait()
+			self.engine.tt.clear()
+		elif command == 'setoption':
+			self.set_option(args)
+		elif command == 'position':
+			self.set_position(args)
+		elif command == 'go':
+			self.go(args)
+		elif command == 'stop':
+			self.stop()
+		elif command == 'quit':
+			return False
+		# debug, ponderhit, register and unknown commands are ignored
+
+		return True
+
+	def set_option(self, args: list[str]) -> None:
+		""" setoption name <name> value <value> """
+		if 'name' not in args or 'value' not in args: return
+		value_at = args.index('value')
+		name = ' '.join(args[args.index('name') + 1:value_at]).lower()
+		value = ' '.join(args[value_at + 1:])
+
+		for option in (HASH_OPTION, THREADS_OPTION):
+			if name != option[0].lower(): continue
+			try:
+				number = min(max(int(value), option[2]), option[3])
+			except ValueError:
+				self.send(f'info string invalid value {value!r} for {option[0]}')
+				return
+
+			self.wait()
+			if option is HASH_OPTION:
+				self.hash_mb = number
+				# the worker processes hold the old table, start afresh
+				self.engine.close()
+				self.engine = Engine(self.hash_mb)
+			else:
+				self.threads = number
+
+	def set_position(self, args: list[str]) -> None:
+		""" position [startpos | fen <FEN>] [moves <move> ...] """
+		if not args: return
+		moves_at = args.index('moves') if 'moves' in args else len(args)
+		if args[0] == 'startpos':
+			fen = STARTING_FEN
+		elif args[0] == 'fen':
+			fen = ' '.join(args[1:moves_at])
+		else:
+			return
+
+		self.wait()
+		try:
+			self.game.load_FEN(fen)
+		except ValueError as e:
+			self.send(f'info string invalid FEN: {e}')
+			self.game.load_FEN(STARTING_FEN)
+			return
+
+		for text in args[moves_at + 1:]:
+			move = self.game.parse_move(text)
+			if not move:
+				self.send(f'info string illegal move {text}')
+				return
+			self.game.make_move(*move)
+
+	def go(self, args: list[str]) -> None:
+		"""
+		go [depth <plies>] [movetime <ms>] [wtime <ms>] [btime <ms>]
+		[winc <ms>] [binc <ms>] [movestogo <moves>] [infinite]
+		"""
+		self.wait()
+
+		limits: dict[str, int] = {}
+		for i, token in enumerate(args[:-1]):
+			if args[i + 1].lstrip('-').isdigit():
+				limits[token] = int(args[i + 1])
+		infinite = 'infinite' in args or 'ponder' in args
+
+		depth = limits.get('depth')
+		time_ms = None if infinite else self.time_for_move(limits)
+		if infinite:
+			depth = MAX_PLY
+
+		self._stop_event = threading.Event()
+		self._infinite = infinite
+		self._search_thread = threading.Thread(
+			target=self._search, args=(depth, time_ms, infinite), daemon=True
+		)
+		self._search_thread.start()
+
+	def time_for_move(self, limits: dict[str, int]) -> int | None:
+		"""
+		returns the time to search in ms: movetime if given, else a share
+		of the remaining time of the player to move and its increment.
+		None if there is no time limit.
+		"""
+		if 'movetime' in limits:
+			return max(1, limits['movetime'] - MOVE_OVERHEAD_MS)
+
+		white = self.game.current_player is self.game.white_p
+		remaining = limits.get('wtime' if white else 'btime')
+		if remaining is None: return None
+		increment = limits.get('winc' if white else 'binc', 0)
+		moves_to_go = limits.get('movestogo') or MOVES_TO_GO
+
+		time_ms = remaining // moves_to_go + increment * 3 // 4
+		# never more than the clock shows, less what the GUI needs
+		time_ms = min(time_ms, remaining - MOVE_OVERHEAD_MS)
+		return max(1, time_ms)
+
+	def _search(self, depth: int | None, time_ms: int | None, infinite: bool) -> None:
+		start = time.perf_counter()
+		move = self.engine.best_move(
+			self.game, depth=depth, time_ms=time_ms, workers=self.threads,
+			stop_event=self._stop_event
+		)
+		elapsed_ms = int((time.perf_counter() - start) * 1000)
+
+		# an infinite search gives its move only when told to stop
+		if infinite:
+			self._stop_event.wait()
+
+		if move is None:
+			self.send('bestmove 0000')
+			return
+
+		engine = self.engine
+		pv = engine.principal_variation(self.game)
+		if not pv or pv[0] != move:
+			pv = [move]
+		self.send(
+			f'info depth {engine.depth} score {self.format_score(engine.score)} ' +
+			f'nodes {engine.nodes} time {elapsed_ms} ' +
+			f'nps {engine.nodes * 1000 // max(1, elapsed_ms)} ' +
+			'pv ' + ' '.join(self.format_line(pv))
+		)
+		self.send(f'bestmove {self.format_line([move])[0]}')
+
+	def format_line(self, moves: list[Move]) -> list[str]:
+		"""
+		returns the moves, played one after another from the position,
+		in long algebraic notation. the pieces of the moves change their
+		coordinates as they move, so each is written before the next is made.
+		"""
+		line: list[str] = []
+		for piece, coordinate, promotion in moves:
+			line.append(long_algebraic(piece.coordinate, coordinate, promotion))
+			self.game.make_move(piece, coordinate, promotion)
+		for _ in moves:
+			self.game.unmake_move()
+		return line
+
+	@staticmethod
+	def format_score(score: int) -> str:
+		""" 'cp <centipawns>', or 'mate <moves>', negative when being mated. """
+		if abs(score) <= MATE_BOUND:
+			return f'cp {score}'
+		moves = (MATE_SCORE - abs(score) + 1) // 2
+		return f'mate {moves if score > 0 else -moves}'
+
+	def stop(self) -> None:
+		""" stops the search, which then writes its best move. """
+		self._stop_event.set()
+		self.engine.stop()
+
+	def wait(self, stop: bool = False) -> None:
+		"""
+		waits for the running search to write its bestmove. it is stopped
+		first if stop is set or it is an infinite search, that never ends.
+		"""
+		if self._search_thread is None: return
+		if stop or self._infinite:
+			self.stop()
+		self._search_thread.join()
+		self._search_thread = None
+
+	def quit(self) -> None:
+		self.wait(stop=True)
+		self.engine.close()
+
+
+def main():
+	UCI().loop()
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,28 @@
+import random
+
+# random 64-bit keys for zobrist hashing of positions.
+# the seed is fixed so that a position has the same key in every process
+# and every run, which lets keys be stored and shared between workers.
+_random = random.Random(0x2317_C4E55)
+
+
+def _key() -> int:
+	return _random.getrandbits(64)
+
+
+# indexed by components.piece_index(color, piece_type) and square index
+PIECE_KEYS: tuple[tuple[int, ...], ...] = tuple(
+	tuple(_key() for _ in range(64)) for _ in range(12)
+)
+# xored in when black is to move
+SIDE_KEY: int = _key()
+# indexed by the castling rights bitmask of ChessGame.castling_rights()
+CASTLING_KEYS: tuple[int, ...] = (0,) + tuple(_key() for _ in range(15))
+# indexed by the file(0-7) of the en passant target square
+EN_PASSANT_KEYS: tuple[int, ...] = tuple(_key() for _ in range(8))
+# PIECE_KEYS of the pawns, and 0 for the other pieces, for the
+# pawn-only key of the board. pawns are the last of each color
+PAWN_KEYS: tuple[tuple[int, ...], ...] = tuple(
+	keys if p_index % 6 == 5 else (0,) * 64
+	for p_index, keys in enumerate(PIECE_KEYS)
+)
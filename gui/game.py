@@ -1,8 +1,9 @@
 import sys
 import pygame as pg
 from gui.config import gui_cfg, RGBColor
-from chess.components import Color, Coordinate, Piece, PieceType, Square
-from chess.game.game import ChessGame, GameEndState
+from gui.sprites import sprite_cache
+from chess.components import COORDINATES, Color, Coordinate, Piece, PieceType, Square
+from chess.game.game import ChessGame, GameEndState, MoveRecord
 
 class ChessGUI(ChessGame):
 	def __init__(self) -> None:
@@ -21,14 +22,7 @@ class ChessGUI(ChessGame):
 		initialize important gui properties and functionalities.
 		"""
 		pg.init()
-		pg.display.set_caption('Chess')
-
-		self.screen = pg.display.set_mode(
-			(
-				gui_cfg.dimensions[0]+gui_cfg.coordinates_width,
-				gui_cfg.dimensions[1]+gui_cfg.square_size
-			)
-		)
+		self.screen = self.create_screen()
 		self.screen.fill(gui_cfg.bg_color)
 
 		board_size = (
@@ -46,35 +40,79 @@ class ChessGUI(ChessGame):
 			pg.font.get_default_font(), gui_cfg.coordinates_font_size
 		)
 
+		# squares to draw again on the next redraw_dirty()
+		self._dirty_squares: set[Coordinate] = set()
+		# parts of board_screen to push to the display on the next update_screen()
+		self._dirty_rects: list[pg.Rect] = []
+		# push the whole screen instead, after drawing outside of the board
+		self._full_update: bool = True
+		# the squares with the selection or valid move markers on them
+		self._highlighted: set[Coordinate] = set()
+		# the piece being animated, it is not drawn on its square
+		self._hidden_piece: Piece | None = None
+		# translucent surfaces of one square, made once
+		self._overlays: dict[tuple, pg.Surface] = {}
+
+	def create_screen(self) -> pg.Surface:
+		""" opens the window and returns its surface. """
+		pg.display.set_caption('Chess')
+
+		return pg.display.set_mode(
+			(
+				gui_cfg.dimensions[0]+gui_cfg.coordinates_width,
+				gui_cfg.dimensions[1]+gui_cfg.square_size
+			)
+		)
+
 	def highlight_valid_moves(self, piece: Piece):
 		"""	highlights the valid moves of the given piece on the board. """
 		# mark the piece if it is not a checked king
-		if piece != piece.player.king or not piece.player.is_in_check():
+		player = self.get_player(piece.color)
+		if piece != player.king or not player.is_in_check():
 			self.draw_square(self.board.get(piece.coordinate), gui_cfg.selected_piece_color)
+		self._highlighted.add(piece.coordinate)
 
 		for move in piece.valid_moves:
 			square = self.board.get(move)
+			rect = self._square_rect(move)
 
-			row, col = square.coordinate.regular
-			l =  col * gui_cfg.square_size
-			t = (7-row) * gui_cfg.square_size
+			# a ring around captures, a dot on empty squares
+			marker = self._move_marker(capture=square.piece is not None)
+			self.board_screen.blit(marker, rect)
 
-			rect = pg.Rect((l, t), (gui_cfg.square_size, gui_cfg.square_size))
-			rect_surface = pg.Surface(rect.size, pg.SRCALPHA)
+			self._dirty_rects.append(rect)
+			self._highlighted.add(move)
+
+	def _move_marker(self, capture: bool) -> pg.Surface:
+		""" returns the translucent marker of a valid move, made once. """
+		key = ('capture' if capture else 'move', gui_cfg.square_size, gui_cfg.valid_color)
+		if key not in self._overlays:
+			marker = pg.Surface((gui_cfg.square_size, gui_cfg.square_size), pg.SRCALPHA)
 			center = (gui_cfg.square_size//2, gui_cfg.square_size//2)
 
-			if not square.piece:
+			if not capture:
 				radius = gui_cfg.square_size/6.5
 				pg.draw.circle(
-					rect_surface, gui_cfg.valid_color, center, radius
+					marker, gui_cfg.valid_color, center, radius
 				)
-			else: # capture
+			else:
 				radius = gui_cfg.square_size*0.49
 				pg.draw.circle(
-					rect_surface, gui_cfg.valid_color, center, radius, width=10
+					marker, gui_cfg.valid_color, center, radius, width=10
 				)
+			self._overlays[key] = marker
 
-			self.board_screen.blit(rect_surface, rect)
+		return self._overlays[key]
+
+	def _overlay(self, color: RGBColor) -> pg.Surface:
+		""" returns a square filled with the given translucent color, made once. """
+		key = ('square', gui_cfg.square_size, color)
+		if key not in self._overlays:
+			overlay = pg.Surface((gui_cfg.square_size, gui_cfg.square_size), pg.SRCALPHA)
+			overlay.fill(color)
+			self._overlays[key] = overlay
+
+		return self._overlays[key]
 
 	def get_coordinate_on_click(self, pos: tuple[int, int]) -> Coordinate | None:
 		"""
@@ -126,7 +164,8 @@ class ChessGUI(ChessGame):
 				self.animate_piece(self.selected_piece, c)
 			self.move(self.selected_piece, c)
 			self.selected_piece = None
-			self.update_board()
+			self.clear_highlights()
+			self.redraw_dirty()
 			return
 
 		# here we had a selected_piece but the move selection failed
@@ -136,25 +175,101 @@ class ChessGUI(ChessGame):
 		if p and p.color == self.turn and p.valid_moves:
 			if p == self.selected_piece:
 				# selected the same piece, ignore and deselect
-				self.update_board()
+				self.clear_highlights()
+				self.redraw_dirty()
 				self.selected_piece = None
 				return
 
 			# selected a new piece
 			self.selected_piece = p
-			self.update_board()
+			self.clear_highlights()
+			self.redraw_dirty()
 			self.highlight_valid_moves(self.selected_piece)
 			return
 		else: # completely wrong click
 			# deselect piece
 			self.selected_piece = None
 
-		self.update_board()
+		self.clear_highlights()
+		self.redraw_dirty()
+
+	def takeback(self):
+		""" takes back the last move and redraws the board. """
+		if not self.unmake_move(): return
+
+		self.selected_piece = None
+		self.clear_highlights()
+		self.redraw_dirty()
+
+	def make_move(
+		self,
+		piece: Piece,
+		coordinate: Coordinate,
+		promotion: PieceType | None = None
+	) -> MoveRecord:
+		record = super().make_move(piece, coordinate, promotion)
+		self._mark_move_dirty(record)
+		return record
+
+	def unmake_move(self) -> MoveRecord | None:
+		record = super().unmake_move()
+		if record:
+			self._mark_move_dirty(record)
+		return record
+
+	def _mark_move_dirty(self, record: MoveRecord) -> None:
+		"""
+		marks the squares changed by the move of the record as dirty,
+		and the squares of the kings, which may have got in or out of check.
+		"""
+		self.mark_dirty(record.origin, record.coordinate)
+		if record.captured_coordinate:
+			# the en passant victim is not on the target square
+			self.mark_dirty(record.captured_coordinate)
+		if record.rook:
+			# the rook lands on the square the king passed over
+			self.mark_dirty(
+				record.rook_origin,
+				COORDINATES[(record.origin.index + record.coordinate.index)//2]
+			)
+
+		for player in (self.white_p, self.black_p):
+			if isinstance(player.king, Piece):
+				self.mark_dirty(player.king.coordinate)
+
+	def mark_dirty(self, *coordinates: Coordinate) -> None:
+		""" marks the squares to draw again on the next redraw_dirty(). """
+		self._dirty_squares.update(coordinates)
+
+	def clear_highlights(self) -> None:
+		""" marks the highlighted squares dirty, to draw them plain again. """
+		self.mark_dirty(*self._highlighted)
+		self._highlighted.clear()
+
+	def redraw_dirty(self) -> None:
+		""" draws only the squares that changed since the last redraw. """
+		for coordinate in self._dirty_squares:
+			self.draw_square(self.board.get(coordinate))
+		self._dirty_squares.clear()
+
+	def _redraw_area(self, rect: pg.Rect) -> None:
+		""" draws the squares that the given rect overlaps again. """
+		size = gui_cfg.square_size
+		for row in range(7 - (rect.bottom - 1)//size, 7 - rect.top//size + 1):
+			for col in range(rect.left//size, (rect.right - 1)//size + 1):
+				if 0 <= row < 8 and 0 <= col < 8:
+					self.draw_square(self.board.squares[row*8 + col])
+
+	def handle_events(self, wait: bool = False):
+		"""
+		handle user events.
+		with wait, sleeps until there is at least one event to handle.
+		"""
+		events: list[pg.event.Event] = [pg.event.wait()] if wait else []
+		events += pg.event.get()
 
-	def handle_events(self):
-		""" handle user events. """
 		# get user input in event loop
-		for event in pg.event.get():
+		for event in events:
 			if event.type == pg.QUIT:
 				pg.quit()
 				sys.exit()
@@ -164,34 +279,28 @@ class ChessGUI(ChessGame):
 				if event.key == pg.K_q:
 					pg.quit()
 					sys.exit()
+				elif event.key in (pg.K_u, pg.K_BACKSPACE):
+					self.takeback()
 
 			elif event.type == pg.MOUSEBUTTONUP and event.button == 1:
 				self.handle_click(event.pos)
 
+			elif event.type in (pg.VIDEOEXPOSE, pg.WINDOWEXPOSED):
+				# the window was covered, the display has to be drawn again
+				self._full_update = True
+
 	def _draw_image_at(
 		self,
 		surface: pg.Surface,
-		filepath: str,
+		image: pg.Surface | None,
 		xy: tuple[int, int]
 	):
 		"""
-		puts the given image in `filepath` on the given surface and position.
+		puts the given image on the given surface and position.
 		"""
-		try:
-			image = pg.image.load(filepath)
-		except Exception as e:
-			print(f'error loading the piece image in {filepath}: {e}')
-			return
+		if image is None: return
 
-		scaled_image = pg.transform.scale(
-			image,
-			(gui_cfg.square_size, gui_cfg.square_size)
-		)
-		scaled_image_rect = scaled_image.get_rect()
-		scaled_image_rect.x = xy[0]
-		scaled_image_rect.y = xy[1]
-
-		surface.blit(scaled_image, scaled_image_rect)
+		surface.blit(image, xy)
 
 	def animate_piece(
 		self,
@@ -247,11 +356,13 @@ class ChessGUI(ChessGame):
 				if abs(rkp1 - rk) < 1e-4: return rkp1
 				rk = rkp1
 
-		# remove the piece to make it not stick to its starting position
-		self.board.remove(piece.coordinate)
-		self.update_board()
+		# the piece is drawn on its way by hand, not on its starting square
+		self._hidden_piece = piece
+		self.mark_dirty(piece.coordinate)
+		self.clear_highlights()
+		self.redraw_dirty()
 
-		piece_filepath: str = self.get_piece_image_path(piece)
+		piece_image: pg.Surface | None = self.get_piece_image(piece)
 		start_coord: Coordinate = piece.coordinate
 
 		start_pos: tuple[int, int] = self.coord_to_pixels_xy(start_coord)
@@ -269,38 +380,44 @@ class ChessGUI(ChessGame):
 
 		current_pos_x, current_pos_y = start_pos
 
+		# where the piece was drawn in the previous frame
+		previous: pg.Rect | None = None
 		for frame in range(n_frames):
-			self.update_board()
-			self._draw_image_at(
-				self.board_screen,
-				piece_filepath,
-				(current_pos_x, current_pos_y)
+			# only the squares under the piece are drawn again
+			if previous:
+				self._redraw_area(previous)
+
+			rect = pg.Rect(
+				(current_pos_x, current_pos_y),
+				(gui_cfg.square_size, gui_cfg.square_size)
 			)
+			self._draw_image_at(self.board_screen, piece_image, rect.topleft)
+			self._dirty_rects.append(rect)
 			self.update_screen()
+			# frames are only paced while animating
+			self.clock.tick(gui_cfg.fps)
+			previous = rect
 
 			current_pos_x += (x_inc:=abs(int(x_inc * rx)) * x_inc_sign)
 			current_pos_y += (y_inc:=abs(int(y_inc * ry)) * y_inc_sign)
 
-	def get_piece_image_path(self, piece: Piece) -> str:
+		if previous:
+			self._redraw_area(previous)
+		self._hidden_piece = None
+
+	def get_piece_image(self, piece: Piece) -> pg.Surface | None:
 		"""
-		returns the filepath of the image file for the given piece.
+		returns the image of the given piece, scaled to the square size.
+		the images are loaded once and kept in the sprite cache.
 		"""
-		filepath = f'assets/pieces/{gui_cfg.pieces_theme}/'
-
-		# add color letter
-		color = piece.color
-		if color == Color.WHITE:
-			filepath += 'w'
-		else:
-			filepath += 'b'
-
-		# add piece type letter
-		filepath += piece.piece_type.value
+		return sprite_cache.get(piece.color, piece.piece_type)
 
-		# add file extension
-		filepath += '.png'
-
-		return filepath
+	def _square_rect(self, coordinate: Coordinate) -> pg.Rect:
+		""" returns the rect of the square of the coordinate on board_screen. """
+		return pg.Rect(
+			self.coord_to_pixels_xy(coordinate),
+			(gui_cfg.square_size, gui_cfg.square_size)
+		)
 
 	def coord_to_pixels_xy(self, coordinate: Coordinate) -> tuple[int, int]:
 		"""
@@ -319,11 +436,9 @@ class ChessGUI(ChessGame):
 
 	def draw_piece(self, piece: Piece):
 		"""	draws the given piece on its coordinate. """
-		filepath: str = self.get_piece_image_path(piece)
-
 		xy: tuple[int, int] = self.coord_to_pixels_xy(piece.coordinate)
 
-		self._draw_image_at(self.board_screen, filepath, xy)
+		self._draw_image_at(self.board_screen, self.get_piece_image(piece), xy)
 
 	def draw_coordinates(self):
 		""" draws the chess coordinates on the side of the board. """
@@ -391,35 +506,37 @@ class ChessGUI(ChessGame):
 		)
 
 	def draw_square(self, square: Square, color: RGBColor | None = None):
-		""" draws the given square object. """
+		"""
+		draws the given square object. a checked king's square is marked.
+		a translucent color is drawn over what is on the square already.
+		"""
 		p = square.piece
-		# if king is in check, do not draw the default square color
-		if ((p and p == p.player.king and p.player.is_in_check()) and color is None): return
+		if p is self._hidden_piece:
+			p = None
+
+		rect = self._square_rect(square.coordinate)
 
 		if color is None:
-			if square.color == Color.BLACK:
+			player = self.get_player(p.color) if p else None
+			if player and p == player.king and player.is_in_check():
+				color = gui_cfg.in_check_color[:3]
+			elif square.color == Color.BLACK:
 				color = gui_cfg.black_color
 			else:
 				color = gui_cfg.white_color
 
-		row, col = square.coordinate.regular
-		l = gui_cfg.square_size * col
-		t = gui_cfg.square_size * (7-row)
-
-		rect = pg.Rect(l, t, gui_cfg.square_size, gui_cfg.square_size)
-		rect_surface = pg.Surface(rect.size, pg.SRCALPHA)
-		pg.draw.rect(rect_surface, color, rect_surface.get_rect())
-		self.board_screen.blit(rect_surface, rect)
+		if len(color) == 4:
+			self.board_screen.blit(self._overlay(color), rect)
+		else:
+			pg.draw.rect(self.board_screen, color, rect)
 
 		# border
-		pg.draw.rect(
-			self.board_screen,
-			gui_cfg.bg_color,
-			((l, t), (gui_cfg.square_size, gui_cfg.square_size)), width=1
-		)
+		pg.draw.rect(self.board_screen, gui_cfg.bg_color, rect, width=1)
 
-		if square.piece:
-			self.draw_piece(square.piece)
+		if p:
+			self.draw_piece(p)
+
+		self._dirty_rects.append(rect)
 
 	def update_board(self):
 		"""
@@ -431,12 +548,25 @@ class ChessGUI(ChessGame):
 			for square in row:
 				self.draw_square(square)
 
+		self._dirty_squares.clear()
+		self._highlighted.clear()
+		self._full_update = True
+
 	def update_screen(self):
-		""" update all the dynamic gui elements. """
-		self.screen.blit(self.board_screen, (0, 0))
+		"""
+		update all the dynamic gui elements.
+		only the changed parts of the board are pushed to the display.
+		"""
+		if self._full_update:
+			self.screen.blit(self.board_screen, (0, 0))
+			pg.display.update()
+		elif self._dirty_rects:
+			for rect in self._dirty_rects:
+				self.screen.blit(self.board_screen, rect, rect)
+			pg.display.update(self._dirty_rects)
 
-		pg.display.update()
-		self.clock.tick(gui_cfg.fps)
+		self._full_update = False
+		self._dirty_rects = []
 
 	def set_promotion_piece(self) -> None:
 		"""
@@ -468,7 +598,8 @@ class ChessGUI(ChessGame):
 		pg.display.update()
 		index = None
 		while True:
-			for event in pg.event.get():
+			# sleep until the next event
+			for event in [pg.event.wait()] + pg.event.get():
 				if event.type == pg.QUIT:
 					pg.quit()
 					sys.exit()
@@ -479,6 +610,7 @@ class ChessGUI(ChessGame):
 			if index is not None: break
 
 		self.screen.fill(gui_cfg.bg_color)
+		self._full_update = True
 		self.promotion_piece = pieces[index]
 
 	def on_game_over(self, state: GameEndState):
@@ -502,34 +634,30 @@ class ChessGUI(ChessGame):
 				gui_cfg.dimensions[1]+ gui_cfg.coordinates_width + 15
 			)
 		)
+		self._full_update = True
 		self.update_screen()
 		while True:
-			self.handle_events()
-
-	def highlight_checked_king(self):
-		if self.current_player.is_in_check():
-			square = self.board.get(self.current_player.king.coordinate)
-			self.draw_square(square, gui_cfg.in_check_color)
+			self.handle_events(wait=True)
+			self.update_screen()
 
 	def step(self) -> bool:
-		""" one step in the chess game + gui updates."""
-		self.white_p.update_valid_moves()
-		self.black_p.update_valid_moves()
-		if self.en_passant_target_square:
-			for pawn in self.en_passant_pawns:
-				pawn.valid_moves.append(self.en_passant_target_square)
-
-		self.handle_events()
+		"""
+		one step in the chess game + gui updates.
+		draws what changed and then sleeps until the next event,
+		nothing changes on the board without one.
+		"""
+		self.update_valid_moves()
 
+		self.redraw_dirty()
 		self.update_screen()
 
-		self.highlight_checked_king()
-
 		state: GameEndState = self.check_state()
 		if state != GameEndState.ONGOING:
 			self.on_game_over(state)
 			return True
 
+		self.handle_events(wait=True)
+
 		return False
 
 def main():
@@ -0,0 +1,183 @@
+import argparse
+import os
+import sys
+import time
+from collections.abc import Iterable
+from multiprocessing import Pool
+
+# no window is opened, SDL has to know before pygame starts
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+# SDL turns SIGTERM into a quit event, then pool workers can't be terminated
+os.environ['SDL_NO_SIGNAL_HANDLERS'] = '1'
+
+import pygame as pg
+from gui.game import ChessGUI
+from chess.batch import read_positions
+from chess.game.game import ChessGame, STARTING_FEN
+from chess.pgn import read_games
+
+
+class HeadlessRenderer(ChessGUI):
+	"""
+	draws boards into images without a window, with the drawing code
+	of ChessGUI on its offscreen board_screen surface.
+	"""
+	def create_screen(self) -> pg.Surface:
+		# a display surface is still needed to convert the piece images
+		return pg.display.set_mode((1, 1))
+
+	def update_screen(self):
+		""" there is no screen, the changes stay on board_screen. """
+		self._full_update = False
+		self._dirty_rects = []
+
+	def render(self, position: str | ChessGame) -> pg.Surface:
+		""" draws the position of a FEN or a game and returns the image. """
+		fen = position if isinstance(position, str) else position.to_FEN()
+		self.load_FEN(fen)
+		self.update_board()
+
+		return self.board_screen
+
+	def save(self, position: str | ChessGame, filepath: str) -> None:
+		""" writes the image of the position of a FEN or a game to filepath. """
+		pg.image.save(self.render(position), filepath)
+
+	def save_sequence(self, fen: str, moves: list[str], directory: str) -> list[str]:
+		"""
+		writes an image of every position from the FEN through the moves,
+		given in long algebraic notation, as 000.png, 001.png ... in directory.
+		only the squares that changed are drawn for each move.
+		returns the filepaths.
+		"""
+		os.makedirs(directory, exist_ok=True)
+
+		self.render(fen)
+		filepaths = [os.path.join(directory, '000.png')]
+		pg.image.save(self.board_screen, filepaths[0])
+
+		for ply, text in enumerate(moves, 1):
+			move = self.parse_move(text)
+			if not move:
+				raise ValueError(f'{text!r} is not a legal move')
+
+			self.make_move(*move)
+			self.redraw_dirty()
+
+			filepaths.append(os.path.join(directory, f'{ply:03}.png'))
+			pg.image.save(self.board_screen, filepaths[-1])
+
+		return filepaths
+
+	def save_game(self, game: ChessGame, directory: str) -> list[str]:
+		""" writes the images of the positions of the game, see save_sequence. """
+		return self.save_sequence(
+			game.initial_FEN or game.to_FEN(), game.moves_played(), directory
+		)
+
+
+# the renderer of a worker process, its sprites are loaded once
+_renderer: HeadlessRenderer | None = None
+
+
+def _init_worker() -> None:
+	global _renderer
+	_renderer = HeadlessRenderer()
+
+
+def _render_position(job: tuple[str, str]) -> str:
+	fen, filepath = job
+	try:
+		_renderer.save(fen, filepath)
+	except ValueError as e:
+		print(f'error rendering {fen!r}: {e}', file=sys.stderr)
+	return filepath
+
+
+def _render_game(job: tuple[str, list[str], str]) -> str:
+	fen, moves, directory = job
+	try:
+		_renderer.save_sequence(fen, moves, directory)
+	except ValueError as e:
+		print(f'error rendering {directory}: {e}', file=sys.stderr)
+	return directory
+
+
+def render_positions(
+	positions: Iterable[tuple[int, str]],
+	directory: str,
+	jobs: int
+) -> int:
+	"""
+	renders (line number, FEN) positions across a pool of jobs processes,
+	each to directory/<line number>.png. returns the number of images.
+	"""
+	os.makedirs(directory, exist_ok=True)
+	work = (
+		(fen, os.path.join(directory, f'{number:06}.png'))
+		for number, fen in positions
+	)
+
+	count = 0
+	with Pool(jobs, _init_worker) as pool:
+		for _ in pool.imap_unordered(_render_position, work, chunksize=16):
+			count += 1
+	return count
+
+
+def render_games(pgn_file, directory: str, jobs: int) -> int:
+	"""
+	renders every game of a PGN file as an image sequence, across a pool
+	of jobs processes, to directory/<game number>/. returns the number of games.
+	"""
+	work = (
+		(
+			pgn_game.headers.get('FEN', STARTING_FEN),
+			pgn_game.moves,
+			os.path.join(directory, f'{number:05}')
+		)
+		for number, pgn_game in enumerate(read_games(pgn_file), 1)
+	)
+
+	count = 0
+	with Pool(jobs, _init_worker) as pool:
+		for _ in pool.imap_unordered(_render_game, work):
+			count += 1
+	return count
+
+
+def main():
+	parser = argparse.ArgumentParser(
+		description='render board images of the positions of a FEN/EPD file, ' +
+		'or of every move of the games of a PGN file, without a display.'
+	)
+	parser.add_argument('file', help='file with one position per line, or a PGN file')
+	parser.add_argument(
+		'-o', '--output', default='boards',
+		help='directory to write the PNG images to(default: boards)'
+	)
+	parser.add_argument(
+		'--pgn', action='store_true',
+		help='the file is PGN, render each game as an image sequence'
+	)
+	parser.add_argument(
+		'-j', '--jobs', type=int, default=os.cpu_count(),
+		help='number of worker processes(default: number of cores)'
+	)
+	args = parser.parse_args()
+
+	start = time.perf_counter()
+	with open(args.file) as file:
+		if args.pgn:
+			count = render_games(file, args.output, args.jobs)
+			kind = 'games'
+		else:
+			count = render_positions(read_positions(file), args.output, args.jobs)
+			kind = 'positions'
+	elapsed = time.perf_counter() - start
+
+	print(f'{count} {kind} rendered in {elapsed:.2f}s')
+
+
+if __name__ == '__main__':
+	main()
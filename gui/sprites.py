@@ -0,0 +1,71 @@
+import pygame as pg
+from gui.config import gui_cfg
+from chess.components import Color, PieceType
+
+
+def piece_image_path(theme: str, color: Color, piece_type: PieceType) -> str:
+	"""
+	returns the filepath of the image file for the given piece,
+	like 'assets/pieces/neo_wood/wk.png'.
+	"""
+	color_letter = 'w' if color == Color.WHITE else 'b'
+	return f'assets/pieces/{theme}/{color_letter}{piece_type.value}.png'
+
+
+class SpriteCache:
+	"""
+	the piece images, loaded from disk once, converted for fast blitting
+	and scaled to the square size. keyed by (theme, color, piece type, size).
+	only one theme and size is kept, the images of the previous ones are
+	dropped when the theme or the size changes.
+	"""
+	def __init__(self) -> None:
+		self._images: dict[tuple[str, Color, PieceType, int], pg.Surface | None] = {}
+		# the (theme, size) of the images in the cache
+		self._theme_size: tuple[str, int] | None = None
+
+	def clear(self) -> None:
+		self._images = {}
+		self._theme_size = None
+
+	def get(
+		self,
+		color: Color,
+		piece_type: PieceType,
+		theme: str | None = None,
+		size: int | None = None
+	) -> pg.Surface | None:
+		"""
+		returns the image of the piece, of gui_cfg's theme and square size
+		if not given. None if the image could not be loaded.
+		"""
+		theme = theme or gui_cfg.pieces_theme
+		size = size or gui_cfg.square_size
+
+		if self._theme_size != (theme, size):
+			self.clear()
+			self._theme_size = (theme, size)
+
+		key = (theme, color, piece_type, size)
+		if key not in self._images:
+			# failures are cached too, not to hit the disk on every draw
+			self._images[key] = self._load(piece_image_path(theme, color, piece_type), size)
+
+		return self._images[key]
+
+	@staticmethod
+	def _load(filepath: str, size: int) -> pg.Surface | None:
+		try:
+			image = pg.image.load(filepath)
+		except Exception as e:
+			print(f'error loading the piece image in {filepath}: {e}')
+			return None
+
+		# converting needs a display, a headless one is fine
+		if pg.display.get_surface() is not None:
+			image = image.convert_alpha()
+
+		return pg.transform.scale(image, (size, size))
+
+
+sprite_cache = SpriteCache()
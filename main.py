@@ -1,9 +1,23 @@
-from gui.game import ChessGUI
+import argparse
+
 
 def main():
+	parser = argparse.ArgumentParser(description='play chess.')
+	parser.add_argument(
+		'--uci', action='store_true',
+		help='run the engine over the UCI protocol instead of opening the board'
+	)
+	args = parser.parse_args()
+
+	if args.uci:
+		from chess.uci import main as uci_main
+		uci_main()
+		return
+
+	from gui.game import ChessGUI
 	game = ChessGUI()
 	while True:
 		game.step()
 
 if __name__ == '__main__':
-	main()
\ No newline at end of file
+	main()
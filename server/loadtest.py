@@ -0,0 +1,130 @@
+import argparse
+import asyncio
+import random
+import time
+from server.server import HOST, PORT
+
+# a game is given up and a new one started after this many plies
+MAX_PLIES: int = 200
+
+
+async def play_games(
+	host: str,
+	port: int,
+	deadline: float,
+	latencies: list[float],
+	engine_depth: int,
+	engine_latencies: list[float]
+) -> int:
+	"""
+	plays random legal moves on one connection until the deadline, starting
+	a new game whenever one ends. with an engine depth, black's moves are
+	asked from the engine instead. the round trip time of every move is
+	appended to latencies, or engine_latencies. returns the games started.
+	"""
+	reader, writer = await asyncio.open_connection(host, port)
+
+	async def request(line: str) -> list[str]:
+		writer.write(line.encode() + b'\n')
+		await writer.drain()
+		reply = (await reader.readline()).decode().split()
+		if not reply or reply[0] == 'error':
+			raise RuntimeError(f'{line!r}: {" ".join(reply)}')
+		return reply
+
+	games = 0
+	try:
+		while time.perf_counter() < deadline:
+			game_id = (await request('new'))[1]
+			games += 1
+			for ply in range(MAX_PLIES):
+				if time.perf_counter() >= deadline: break
+
+				if engine_depth and ply % 2:
+					start = time.perf_counter()
+					state = await request(f'engine {game_id} {engine_depth}')
+					engine_latencies.append(time.perf_counter() - start)
+				else:
+					moves = (await request(f'legal {game_id}'))[2:]
+					start = time.perf_counter()
+					state = await request(f'move {game_id} {random.choice(moves)}')
+					latencies.append(time.perf_counter() - start)
+
+				# state <id> <move> <status> <FEN>
+				if state[3] not in ('ongoing', 'check'): break
+
+			await request(f'close {game_id}')
+	finally:
+		writer.close()
+
+	return games
+
+
+def percentile(values: list[float], p: float) -> float:
+	""" the value below which p percent of the values fall. """
+	if not values: return 0.0
+	values = sorted(values)
+	return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def report(name: str, latencies: list[float], elapsed: float) -> None:
+	print(
+		f'{name}: {len(latencies)} moves, {len(latencies)/elapsed:.0f} moves/s, ' +
+		f'p50 {percentile(latencies, 50)*1000:.2f}ms, ' +
+		f'p99 {percentile(latencies, 99)*1000:.2f}ms, ' +
+		f'max {max(latencies, default=0)*1000:.2f}ms'
+	)
+
+
+async def load_test(
+	host: str,
+	port: int,
+	clients: int,
+	seconds: float,
+	engine_depth: int
+) -> None:
+	latencies: list[float] = []
+	engine_latencies: list[float] = []
+
+	start = time.perf_counter()
+	deadline = start + seconds
+	games = await asyncio.gather(*(
+		play_games(host, port, deadline, latencies, engine_depth, engine_latencies)
+		for _ in range(clients)
+	))
+	elapsed = time.perf_counter() - start
+
+	print(f'{clients} clients, {sum(games)} games in {elapsed:.2f}s')
+	report('moves', latencies, elapsed)
+	if engine_depth:
+		report('engine moves', engine_latencies, elapsed)
+
+
+def main():
+	parser = argparse.ArgumentParser(
+		description='load test the game server with many clients playing at once.'
+	)
+	parser.add_argument('--host', default=HOST, help=f'server address(default: {HOST})')
+	parser.add_argument(
+		'-p', '--port', type=int, default=PORT,
+		help=f'server port(default: {PORT})'
+	)
+	parser.add_argument(
+		'-c', '--clients', type=int, default=100,
+		help='number of connections, each playing one game at a time(default: 100)'
+	)
+	parser.add_argument(
+		'-t', '--time', type=float, default=10,
+		help='seconds to run for(default: 10)'
+	)
+	parser.add_argument(
+		'-e', '--engine-depth', type=int, default=0,
+		help="depth of engine replies for black's moves(default: 0, random moves)"
+	)
+	args = parser.parse_args()
+
+	asyncio.run(load_test(args.host, args.port, args.clients, args.time, args.engine_depth))
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,243 @@
+import argparse
+import asyncio
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from chess.engine import Engine
+from chess.game.game import ChessGame, STARTING_FEN, long_algebraic
+
+HOST: str = '127.0.0.1'
+PORT: int = 8765
+
+# the deepest search a client can ask the engine for
+MAX_ENGINE_DEPTH: int = 6
+
+HELP: str = (
+	'commands: new [<FEN>] | join <id> | state <id> | legal <id> | ' +
+	'move <id> <move> | engine <id> [<depth>] | close <id> | quit'
+)
+
+# the engine of a worker process of the pool, reused for every request
+_engine: Engine | None = None
+_engine_game: ChessGame | None = None
+
+
+def _init_worker(hash_mb: int) -> None:
+	global _engine, _engine_game
+	_engine = Engine(hash_mb)
+	_engine_game = ChessGame()
+
+
+def engine_move(fen: str, moves: list[str], depth: int) -> str | None:
+	"""
+	searches the position after the moves from the FEN in a worker process,
+	returns the best move in long algebraic notation or None if there is none.
+	"""
+	game = _engine_game
+	game.load_FEN(fen)
+	for text in moves:
+		game.make_move(*game.parse_move(text))
+
+	move = _engine.best_move(game, depth=depth)
+	if move is None: return None
+	piece, coordinate, promotion = move
+	return long_algebraic(piece.coordinate, coordinate, promotion)
+
+
+def game_status(game: ChessGame) -> str:
+	""" one of: ongoing, check, checkmate, stalemate, draw. """
+	in_check = game.current_player.is_in_check()
+	if not game.legal_moves():
+		return 'checkmate' if in_check else 'stalemate'
+	if (
+		game.is_threefold_repetition() or game.is_fifty_moves() or
+		game.is_insufficient_material()
+	):
+		return 'draw'
+	return 'check' if in_check else 'ongoing'
+
+
+@dataclass(slots=True, eq=False)
+class Session:
+	""" a game hosted by the server and the connections that follow it. """
+	id: int
+	game: ChessGame
+	subscribers: set[asyncio.StreamWriter] = field(default_factory=set)
+	# one move at a time, an engine reply holds it while it searches
+	lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+	def state(self, move: str = '-') -> str:
+		""" 'state <id> <last move> <status> <FEN>' """
+		return f'state {self.id} {move} {game_status(self.game)} {self.game.to_FEN()}'
+
+
+class GameServer:
+	"""
+	hosts many games in one process over a line based text protocol on TCP.
+	every move is checked against the legal moves of the game, and the new
+	state is pushed to every connection that joined the game. engine
+	replies are searched in a pool of processes, so that the event loop
+	keeps serving the other games meanwhile.
+
+	replies: 'state <id> <last move> <status> <FEN>', 'legal <id> <moves>',
+	'closed <id>' and 'error <message>'.
+	"""
+	def __init__(self, engine_workers: int = 1, hash_mb: int = 16):
+		self.sessions: dict[int, Session] = {}
+		self._ids = itertools.count(1)
+		self.executor = ProcessPoolExecutor(
+			engine_workers, initializer=_init_worker, initargs=(hash_mb,)
+		)
+
+	async def serve(self, host: str = HOST, port: int = PORT) -> None:
+		server = await asyncio.start_server(self.handle_connection, host, port)
+		async with server:
+			print(f'serving on {host}:{port}')
+			await server.serve_forever()
+
+	def close(self) -> None:
+		self.executor.shutdown(cancel_futures=True)
+
+	async def handle_connection(
+		self,
+		reader: asyncio.StreamReader,
+		writer: asyncio.StreamWriter
+	) -> None:
+		try:
+			while line := await reader.readline():
+				reply = await self.handle(line.decode().split(), writer)
+				if reply is None: break
+				if reply:
+					writer.write(reply.encode() + b'\n')
+				await writer.drain()
+		except (ConnectionError, UnicodeDecodeError):
+			pass
+		finally:
+			for session in self.sessions.values():
+				session.subscribers.discard(writer)
+			writer.close()
+
+	async def handle(self, tokens: list[str], writer: asyncio.StreamWriter) -> str | None:
+		"""
+		handles one command and returns the reply to the sender, empty if it
+		was already pushed as a state update, None to close the connection.
+		"""
+		if not tokens: return ''
+		command, args = tokens[0], tokens[1:]
+
+		if command == 'quit': return None
+		if command == 'new':
+			return self.new_game(' '.join(args) or STARTING_FEN, writer)
+
+		if command not in ('join', 'state', 'legal', 'move', 'engine', 'close'):
+			return f'error unknown command {command!r}, {HELP}'
+		if not args or not args[0].isdigit() or int(args[0]) not in self.sessions:
+			return f'error no game {args[0] if args else ""}'.rstrip()
+		session = self.sessions[int(args[0])]
+
+		if command == 'join':
+			session.subscribers.add(writer)
+			return session.state()
+		if command == 'state':
+			return session.state()
+		if command == 'legal':
+			moves = [
+				long_algebraic(piece.coordinate, coordinate, promotion)
+				for piece, coordinate, promotion in session.game.legal_moves()
+			]
+			return f'legal {session.id} {" ".join(moves)}'.rstrip()
+		if command == 'close':
+			del self.sessions[session.id]
+			self.broadcast(session, f'closed {session.id}')
+			return '' if writer in session.subscribers else f'closed {session.id}'
+
+		if command == 'move':
+			if len(args) < 2:
+				return 'error usage: move <id> <move>'
+			async with session.lock:
+				return self.play(session, args[1], writer)
+
+		# engine
+		depth = int(args[1]) if len(args) > 1 and args[1].isdigit() else 3
+		depth = min(max(depth, 1), MAX_ENGINE_DEPTH)
+		async with session.lock:
+			game = session.game
+			move = await asyncio.get_running_loop().run_in_executor(
+				self.executor, engine_move,
+				game.initial_FEN, game.moves_played(), depth
+			)
+			if move is None:
+				return f'error game {session.id} is over'
+			return self.play(session, move, writer)
+
+	def new_game(self, fen: str, writer: asyncio.StreamWriter) -> str:
+		""" starts a game from the FEN, the sender joins it. """
+		game = ChessGame()
+		try:
+			game.load_FEN(fen)
+		except Exception as e:
+			# a bad FEN must not end the connection
+			return f'error invalid FEN: {e}'
+
+		session = Session(next(self._ids), game)
+		session.subscribers.add(writer)
+		self.sessions[session.id] = session
+		return session.state()
+
+	def play(self, session: Session, text: str, writer: asyncio.StreamWriter) -> str:
+		""" plays the move given in long algebraic notation if it is legal. """
+		game = session.game
+		if game_status(game) not in ('ongoing', 'check'):
+			return f'error game {session.id} is over'
+
+		move = game.parse_move(text)
+		if not move:
+			return f'error illegal move {text} in game {session.id}'
+
+		game.make_move(*move)
+		state = session.state(text)
+		self.broadcast(session, state)
+		# the sender gets the update as its reply if it follows the game
+		return '' if writer in session.subscribers else state
+
+	@staticmethod
+	def broadcast(session: Session, line: str) -> None:
+		data = line.encode() + b'\n'
+		for subscriber in list(session.subscribers):
+			if subscriber.is_closing():
+				session.subscribers.discard(subscriber)
+				continue
+			subscriber.write(data)
+
+
+def main():
+	parser = argparse.ArgumentParser(
+		description='host chess games over TCP, with a line based text protocol.'
+	)
+	parser.add_argument('--host', default=HOST, help=f'address to listen on(default: {HOST})')
+	parser.add_argument(
+		'-p', '--port', type=int, default=PORT,
+		help=f'port to listen on(default: {PORT})'
+	)
+	parser.add_argument(
+		'-j', '--jobs', type=int, default=os.cpu_count(),
+		help='number of engine worker processes(default: number of cores)'
+	)
+	parser.add_argument(
+		'--hash', type=int, default=16,
+		help='transposition table size of each engine worker in MB(default: 16)'
+	)
+	args = parser.parse_args()
+
+	server = GameServer(args.jobs, args.hash)
+	try:
+		asyncio.run(server.serve(args.host, args.port))
+	except KeyboardInterrupt:
+		pass
+	finally:
+		server.close()
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,55 @@
+import pytest
+from chess.game.game import ChessGame, GameEndState, STARTING_FEN
+
+
+def play(fen: str, moves: list[str]) -> ChessGame:
+	game = ChessGame()
+	game.load_FEN(fen)
+	for text in moves:
+		game.make_move(*game.parse_move(text))
+	return game
+
+
+def test_threefold_repetition():
+	knights = ['g1f3', 'g8f6', 'f3g1', 'f6g8']
+	game = play(STARTING_FEN, knights)
+	assert game.repetitions() == 1
+	assert not game.is_threefold_repetition()
+
+	game.make_move(*game.parse_move('g1f3'))
+	assert game.repetitions() == 1
+
+	for text in knights[1:] + knights[:1]:
+		game.make_move(*game.parse_move(text))
+	assert game.is_threefold_repetition()
+	assert game.check_state() == GameEndState.DRAW
+
+
+def test_a_pawn_move_ends_the_repetitions():
+	game = play(STARTING_FEN, ['g1f3', 'g8f6', 'f3g1', 'f6g8', 'e2e4'])
+	assert game.repetitions() == 0
+
+
+def test_fifty_moves():
+	game = play('4k3/8/8/8/8/8/8/R3K3 w - - 99 80', [])
+	assert not game.is_fifty_moves()
+
+	game.make_move(*game.parse_move('a1a2'))
+	assert game.is_fifty_moves()
+	assert game.check_state() == GameEndState.DRAW
+
+	game.unmake_move()
+	assert game.halfmove_clock == 99
+
+
+@pytest.mark.parametrize(('fen', 'insufficient'), [
+	('4k3/8/8/8/8/8/8/4K3 w - - 0 1', True),
+	('4k3/8/8/8/8/8/8/4KN2 w - - 0 1', True),
+	# the bishops are both on dark squares
+	('4kb2/8/8/8/8/8/8/2B1K3 w - - 0 1', True),
+	('4k1b1/8/8/8/8/8/8/2B1K3 w - - 0 1', False),
+	('4k3/8/8/8/8/8/8/3NKN2 w - - 0 1', False),
+	('4k3/8/8/8/8/8/4P3/4K3 w - - 0 1', False),
+])
+def test_insufficient_material(fen: str, insufficient: bool):
+	assert play(fen, []).is_insufficient_material() == insufficient
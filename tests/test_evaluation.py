@@ -0,0 +1,30 @@
+import random
+from chess.evaluation import evaluate
+from chess.game.game import ChessGame
+from chess.perft import PERFT_SUITE
+
+
+def mirror(fen: str) -> str:
+	""" returns the FEN with the colors swapped and the board flipped. """
+	placements, turn, castling, en_passant, *clocks = fen.split()
+	placements = '/'.join(reversed(placements.split('/'))).swapcase()
+	turn = 'b' if turn == 'w' else 'w'
+	castling = ''.join(sorted(castling.swapcase())) if castling != '-' else '-'
+	if en_passant != '-':
+		en_passant = en_passant[0] + ('3' if en_passant[1] == '6' else '6')
+	return ' '.join([placements, turn, castling, en_passant, *clocks])
+
+
+def test_mirrored_positions_score_the_same():
+	rng = random.Random(3)
+	game, twin = ChessGame(), ChessGame()
+	for _, fen, _ in PERFT_SUITE:
+		game.load_FEN(fen)
+		for _ in range(40):
+			moves = game.legal_moves()
+			if not moves: break
+			game.make_move(*rng.choice(moves))
+
+			position = game.to_FEN()
+			twin.load_FEN(mirror(position))
+			assert evaluate(twin) == evaluate(game), position
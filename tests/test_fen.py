@@ -0,0 +1,39 @@
+import pytest
+from chess.game.game import ChessGame
+from chess.perft import PERFT_SUITE
+
+
+@pytest.mark.parametrize('fen', [fen for _, fen, _ in PERFT_SUITE] + [
+	'rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3',
+	'4k3/8/8/8/8/8/4P3/8 b - - 12 40',
+])
+def test_round_trip(fen: str):
+	game = ChessGame()
+	game.load_FEN(fen)
+	assert game.to_FEN() == fen
+
+
+def test_moves_update_the_fen():
+	game = ChessGame()
+	game.classic_setup()
+	for text in ('e2e4', 'c7c5', 'g1f3'):
+		game.make_move(*game.parse_move(text))
+	assert game.to_FEN() == 'rnbqkbnr/pp1ppppp/8/2p5/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2'
+
+
+@pytest.mark.parametrize('fen', [
+	'',
+	'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w KQkq - 0 1',
+	'rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+	'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBXR w KQkq - 0 1',
+	'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1',
+	'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBKKBNR w KQkq - 0 1',
+	'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq e3 0 1',
+	'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq z9 0 1',
+])
+def test_a_bad_fen_is_rejected_and_keeps_the_position(fen: str):
+	game = ChessGame()
+	game.load_FEN('4k3/8/8/8/8/8/4P3/4K3 w - - 0 1')
+	with pytest.raises(ValueError):
+		game.load_FEN(fen)
+	assert game.to_FEN() == '4k3/8/8/8/8/8/4P3/4K3 w - - 0 1'
@@ -0,0 +1,24 @@
+from chess.game.game import ChessGame
+
+
+def test_unmake_move_keeps_the_order_of_the_pieces():
+	game = ChessGame()
+	# the pawn on b7 promotes by taking the rook on a8
+	game.load_FEN('r3k3/1P6/8/8/8/8/8/4K1N1 w - - 0 1')
+	white = list(game.white_p.pieces)
+	black = list(game.black_p.pieces)
+
+	game.make_move(*game.parse_move('b7a8n'))
+	game.unmake_move()
+
+	assert all(a is b for a, b in zip(game.white_p.pieces, white, strict=True))
+	assert all(a is b for a, b in zip(game.black_p.pieces, black, strict=True))
+
+
+def test_reloading_a_game_with_a_promotion_reuses_the_pieces():
+	game = ChessGame()
+	for _ in range(10):
+		game.load_FEN('4k3/1P6/8/8/8/8/8/4K3 w - - 0 1')
+		game.make_move(*game.parse_move('b7b8q'))
+
+	assert all(len(pool) <= 1 for pool in game._piece_pool)
@@ -0,0 +1,58 @@
+import io
+from chess.game.game import ChessGame
+from chess.pgn import read_games, san, write_game
+
+
+def play(fen: str, moves: list[str]) -> ChessGame:
+	game = ChessGame()
+	game.load_FEN(fen)
+	for text in moves:
+		game.make_move(*game.parse_move(text))
+	return game
+
+
+def test_round_trip_with_a_move_of_the_promoted_piece():
+	fen = '4k3/1P6/8/8/8/8/8/4K3 w - - 0 1'
+	moves = ['b7b8q', 'e8d7', 'b8b5']
+	game = play(fen, moves)
+	position = game.to_FEN()
+
+	file = io.StringIO()
+	write_game(file, game)
+
+	assert '1. b8=Q+ Kd7 2. Qb5+ *' in file.getvalue()
+	# the game is left as it was
+	assert game.to_FEN() == position
+	assert game.moves_played() == moves
+	assert sorted(str(p.coordinate) for p in game.white_p.pieces) == ['<b5>', '<e1>']
+
+	file.seek(0)
+	pgn_game = next(read_games(file))
+	assert pgn_game.error is None
+	assert pgn_game.headers['FEN'] == fen
+	assert pgn_game.moves == moves
+
+
+def test_a_bad_fen_tag_does_not_end_the_stream():
+	file = io.StringIO(
+		'[FEN "bad fen"]\n\n1. e4 e5 *\n\n'
+		'[Event "next"]\n\n1. e4 e5 *\n'
+	)
+	bad, good = read_games(file)
+
+	assert bad.error.startswith('invalid FEN')
+	assert bad.moves == []
+	assert good.error is None
+	assert good.moves == ['e2e4', 'e7e5']
+
+
+def test_disambiguation():
+	game = play('4k3/8/8/8/8/8/4K3/R6R w - - 0 1', [])
+	assert san(game, game.parse_move('a1d1')) == 'Rad1'
+
+	game = play('4k3/8/8/R7/8/8/8/R3K3 w - - 0 1', [])
+	assert san(game, game.parse_move('a1a3')) == 'R1a3'
+
+	game = play('7k/2N5/8/8/8/2N1N3/8/4K3 w - - 0 1', [])
+	assert san(game, game.parse_move('c3d5')) == 'Nc3d5'
+	assert san(game, game.parse_move('c7a8')) == 'Na8'
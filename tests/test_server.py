@@ -0,0 +1,34 @@
+import asyncio
+from server.server import GameServer
+
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, line: str) -> str:
+	writer.write(line.encode() + b'\n')
+	await writer.drain()
+	return (await reader.readline()).decode().strip()
+
+
+async def new_game_with_two_kings() -> list[str]:
+	game_server = GameServer(engine_workers=1)
+	server = await asyncio.start_server(game_server.handle_connection, '127.0.0.1', 0)
+	port = server.sockets[0].getsockname()[1]
+	try:
+		reader, writer = await asyncio.open_connection('127.0.0.1', port)
+		replies = [
+			await request(reader, writer, 'new rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBKKBNR w KQkq - 0 1'),
+			# the connection is still served
+			await request(reader, writer, 'new'),
+		]
+		writer.close()
+		return replies
+	finally:
+		server.close()
+		await server.wait_closed()
+		game_server.close()
+
+
+def test_new_game_with_two_kings_is_an_error():
+	error, state = asyncio.run(new_game_with_two_kings())
+
+	assert error == 'error invalid FEN: white should have one king, not 2'
+	assert state.startswith('state 1 - ongoing rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w')
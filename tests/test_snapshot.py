@@ -0,0 +1,49 @@
+import pytest
+from chess.components import Piece
+from chess.game.game import SNAPSHOT_SIZE, ChessGame
+from chess.perft import PERFT_SUITE
+
+
+@pytest.mark.parametrize('fen', [fen for _, fen, _ in PERFT_SUITE] + [
+	'rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3',
+])
+def test_restore_a_snapshot(fen: str):
+	game = ChessGame()
+	game.load_FEN(fen)
+	snapshot = game.snapshot()
+	assert len(snapshot) == SNAPSHOT_SIZE
+
+	other = ChessGame()
+	other.classic_setup()
+	other.restore(snapshot)
+	assert other.to_FEN() == fen
+	assert other.zobrist_key == game.zobrist_key
+	assert other.perft(1) == game.perft(1)
+
+
+def test_snapshots_of_the_same_position_are_equal():
+	game = ChessGame()
+	game.classic_setup()
+	start = game.snapshot()
+	for text in ('g1f3', 'g8f6', 'f3g1', 'f6g8'):
+		game.make_move(*game.parse_move(text))
+
+	# only the clocks differ
+	assert game.snapshot()[:64] == start[:64]
+	assert game.snapshot() != start
+
+
+def test_a_bad_snapshot_is_rejected():
+	game = ChessGame()
+	with pytest.raises(ValueError):
+		game.restore(bytes(SNAPSHOT_SIZE - 1))
+	with pytest.raises(ValueError):
+		game.restore(bytes([13]) + bytes(SNAPSHOT_SIZE - 1))
+
+
+def test_pieces_have_no_dict():
+	game = ChessGame()
+	game.classic_setup()
+	piece: Piece = game.white_p.pieces[0]
+	assert not hasattr(piece, '__dict__')
+	assert not hasattr(piece, 'player')
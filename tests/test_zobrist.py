@@ -0,0 +1,42 @@
+import random
+from chess.game.game import ChessGame
+from chess.perft import PERFT_SUITE
+
+
+def test_incremental_key_matches_the_recomputed_key():
+	rng = random.Random(1)
+	game = ChessGame()
+	for _, fen, _ in PERFT_SUITE:
+		game.load_FEN(fen)
+		keys = [game.zobrist_key]
+		for _ in range(60):
+			moves = game.legal_moves()
+			if not moves: break
+			game.make_move(*rng.choice(moves))
+			assert game.zobrist_key == game.compute_zobrist_key()
+			keys.append(game.zobrist_key)
+
+		# and it comes back on undo
+		while game.history:
+			keys.pop()
+			game.unmake_move()
+			assert game.zobrist_key == keys[-1]
+
+
+def test_transpositions_have_the_same_key():
+	a, b = ChessGame(), ChessGame()
+	a.classic_setup()
+	b.classic_setup()
+	for text in ('g1f3', 'g8f6', 'b1c3'):
+		a.make_move(*a.parse_move(text))
+	for text in ('b1c3', 'g8f6', 'g1f3'):
+		b.make_move(*b.parse_move(text))
+	assert a.zobrist_key == b.zobrist_key
+
+	# the en passant square is part of the key
+	a.load_FEN('4k3/8/8/8/3p4/8/4P3/4K3 w - - 0 1')
+	a.make_move(*a.parse_move('e2e4'))
+	b.load_FEN('4k3/8/8/8/3pP3/8/8/4K3 b - e3 0 1')
+	assert a.zobrist_key == b.zobrist_key
+	b.load_FEN('4k3/8/8/8/3pP3/8/8/4K3 b - - 0 1')
+	assert a.zobrist_key != b.zobrist_key